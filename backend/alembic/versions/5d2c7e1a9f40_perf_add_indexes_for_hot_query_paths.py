@@ -0,0 +1,41 @@
+"""perf: add indexes for hot query paths
+
+Revision ID: 5d2c7e1a9f40
+Revises: 448a1a1e9322
+Create Date: 2026-10-19 10:12:31.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2c7e1a9f40'
+down_revision: Union[str, None] = '448a1a1e9322'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ScheduleService daily/weekly lookups: term + week type + day
+    op.create_index('ix_term_schedule_term_id_week_type_id_day_of_week_id', 'term_schedule', ['term_id', 'week_type_id', 'day_of_week_id'], unique=False)
+    # only_for_me filters, attendance report (teacher + subject), teacher -> groups
+    op.create_index('ix_term_schedule_teacher_id_subject_id', 'term_schedule', ['teacher_id', 'subject_id'], unique=False)
+    # Primary key is (schedule_id, group_id); lookups by group need their own index
+    op.create_index(op.f('ix_schedule_groups_group_id'), 'schedule_groups', ['group_id'], unique=False)
+    op.create_index(op.f('ix_students_group_id'), 'students', ['group_id'], unique=False)
+    # Attendance report and the duplicate check in confirm_attendance
+    op.create_index('ix_attendance_schedule_id_lesson_date_student_id', 'attendance', ['schedule_id', 'lesson_date', 'student_id'], unique=False)
+    # ON DELETE CASCADE from students
+    op.create_index(op.f('ix_attendance_student_id'), 'attendance', ['student_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_attendance_student_id'), table_name='attendance')
+    op.drop_index('ix_attendance_schedule_id_lesson_date_student_id', table_name='attendance')
+    op.drop_index(op.f('ix_students_group_id'), table_name='students')
+    op.drop_index(op.f('ix_schedule_groups_group_id'), table_name='schedule_groups')
+    op.drop_index('ix_term_schedule_teacher_id_subject_id', table_name='term_schedule')
+    op.drop_index('ix_term_schedule_term_id_week_type_id_day_of_week_id', table_name='term_schedule')
@@ -0,0 +1,27 @@
+"""perf: index attendance keyset order
+
+Revision ID: 8e3b41f0c2d7
+Revises: 5d2c7e1a9f40
+Create Date: 2026-10-19 15:40:12.204418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3b41f0c2d7'
+down_revision: Union[str, None] = '5d2c7e1a9f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # /reports/attendance pages by (lesson_date, id)
+    op.create_index('ix_attendance_lesson_date_id', 'attendance', ['lesson_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_lesson_date_id', table_name='attendance')
@@ -1,5 +1,8 @@
-from fastapi import Depends, HTTPException, status
-from fastapi_users import BaseUserManager, FastAPIUsers, IntegerIDMixin
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, FastAPIUsers, IntegerIDMixin, schemas
 from fastapi_users.authentication import (
     JWTStrategy,
     AuthenticationBackend,
@@ -12,8 +15,11 @@ from sqlalchemy import select
 from app.config import settings
 from app.models import Administrator, Student, Teacher, User
 from app.database import get_async_session, get_db
+from app.passwords import DeferredPasswordHelper, password_helper
 from sqlalchemy.ext.asyncio import AsyncSession
 
+T = TypeVar("T")
+
 token_max_age_seconds = (
     settings.access_token_expire_hours * 3600
 )  # TODO split into bearer and cookie max age
@@ -52,6 +58,57 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     reset_password_token_secret = settings.secret_key
     verification_token_secret = settings.secret_key
 
+    # The base class hashes through self.password_helper synchronously. It
+    # is a DeferredPasswordHelper here, and every operation that hashes or
+    # verifies a password runs through _pooled so the work lands in the pool.
+
+    def __init__(self, user_db: SQLAlchemyUserDatabase):
+        super().__init__(user_db, DeferredPasswordHelper())
+
+    async def _pooled(self, operation: Callable[[], Awaitable[T]]) -> T:
+        return await password_helper.run_deferred(self.password_helper, operation)
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[User]:
+        base = super()
+        return await self._pooled(lambda: base.authenticate(credentials))
+
+    async def create(
+        self,
+        user_create: schemas.UC,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        base = super()
+        return await self._pooled(lambda: base.create(user_create, safe, request))
+
+    async def update(
+        self,
+        user_update: schemas.UU,
+        user: User,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        base = super()
+        return await self._pooled(
+            lambda: base.update(user_update, user, safe, request)
+        )
+
+    async def forgot_password(
+        self, user: User, request: Optional[Request] = None
+    ) -> None:
+        base = super()
+        return await self._pooled(lambda: base.forgot_password(user, request))
+
+    async def reset_password(
+        self, token: str, password: str, request: Optional[Request] = None
+    ) -> User:
+        base = super()
+        return await self._pooled(
+            lambda: base.reset_password(token, password, request)
+        )
+
 
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
     yield SQLAlchemyUserDatabase(session, User)
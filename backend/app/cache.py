@@ -0,0 +1,262 @@
+# app/cache.py
+import asyncio
+import logging
+from itertools import chain
+from typing import Dict, Optional, Set, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import (
+    Administrator,
+    DayOfWeek,
+    Group,
+    LessonPeriod,
+    LessonType,
+    Role,
+    ScheduleGroup,
+    Site,
+    Student,
+    Subject,
+    Teacher,
+    Term,
+    TermSchedule,
+    User,
+    WeekType,
+)
+from app.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KEY_PREFIX = "profile:user:"
+PROFILE_GENERATION_KEY = "profile:generation"
+SCHEDULE_GENERATION_KEY = "schedule:generation"
+SCHEDULE_RESPONSE_KEY_PREFIX = "schedule:response:"
+
+# Changes to these rows only affect the owning user's profile
+USER_SCOPED_MODELS = (User, Teacher, Student, Administrator)
+# Changes to these rows may affect any number of profiles
+SHARED_MODELS = (Role, Group)
+# Changes to these rows affect profiles and everything derived from timetables
+SCHEDULE_MODELS = (Term, TermSchedule, ScheduleGroup)
+# Rows embedded in cached schedule responses, on top of the timetable itself
+SCHEDULE_EMBEDDED_MODELS = (
+    Teacher,
+    Group,
+    Subject,
+    Site,
+    LessonType,
+    LessonPeriod,
+    DayOfWeek,
+    WeekType,
+)
+
+_PENDING_KEY = "cache_invalidations"
+_background_tasks: Set[asyncio.Task] = set()
+
+
+class ProfileCache:
+    """
+    Redis cache of serialized UserProfileResponse bodies.
+
+    Entries are stored as "<shared generation>.<user generation>|<json>".
+    Bumping the shared generation invalidates every entry at once, bumping a
+    user's only theirs. A lookup checks both generations and the entry in a
+    single MGET round trip, so a body built from rows read before a bump is
+    never served after it, even when it is stored after the bump.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def _key(user_id: int, lang: Optional[str] = None) -> str:
+        # One entry per requested locale; the bare key holds both
+        suffix = f":{lang}" if lang else ""
+        return f"{PROFILE_KEY_PREFIX}{user_id}{suffix}"
+
+    @staticmethod
+    def _generation_key(user_id: int) -> str:
+        return f"{PROFILE_KEY_PREFIX}{user_id}:gen"
+
+    async def lookup(
+        self, user_id: int, lang: Optional[str] = None
+    ) -> Tuple[str, Optional[str]]:
+        """Returns the current generation and the cached body, if still valid"""
+        try:
+            shared, user, entry = await self.redis.mget(
+                PROFILE_GENERATION_KEY,
+                self._generation_key(user_id),
+                self._key(user_id, lang),
+            )
+        except RedisError:
+            logger.warning("Profile cache lookup failed", exc_info=True)
+            return "0.0", None
+
+        generation = f"{shared or 0}.{user or 0}"
+        if entry is None:
+            return generation, None
+
+        entry_generation, _, body = entry.partition("|")
+        if entry_generation != generation:
+            return generation, None
+        return generation, body
+
+    async def store(
+        self, user_id: int, generation: str, body: str, lang: Optional[str] = None
+    ) -> None:
+        try:
+            await self.redis.set(
+                self._key(user_id, lang),
+                f"{generation}|{body}",
+                ex=settings.profile_cache_ttl_seconds,
+            )
+        except RedisError:
+            logger.warning("Profile cache store failed", exc_info=True)
+
+    async def invalidate_users(self, user_ids: Set[int]) -> None:
+        if not user_ids:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                key = self._generation_key(user_id)
+                pipe.incr(key)
+                # Outlives every entry tagged with the previous generation,
+                # including one a racing reader stores right after the bump
+                pipe.expire(key, settings.profile_cache_ttl_seconds * 2)
+            await pipe.execute()
+
+    async def invalidate_all(self) -> None:
+        await self.redis.incr(PROFILE_GENERATION_KEY)
+
+
+class ScheduleResponseCache:
+    """
+    Redis cache of serialized schedule responses, kept in every supported
+    content coding so a hit needs neither serialization nor compression.
+
+    Uses the binary client. Entries are "<generation>|<body>" tagged with
+    the timetable generation, and a lookup checks both in one MGET.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def _key(key: str, encoding: str) -> str:
+        return f"{SCHEDULE_RESPONSE_KEY_PREFIX}{key}:{encoding}"
+
+    async def lookup(self, key: str, encoding: str) -> Tuple[bytes, Optional[bytes]]:
+        """Returns the current generation and the cached body, if still valid"""
+        try:
+            generation, entry = await self.redis.mget(
+                SCHEDULE_GENERATION_KEY, self._key(key, encoding)
+            )
+        except RedisError:
+            logger.warning("Schedule cache lookup failed", exc_info=True)
+            return b"0", None
+
+        generation = generation or b"0"
+        if entry is None:
+            return generation, None
+
+        entry_generation, _, body = entry.partition(b"|")
+        if entry_generation != generation:
+            return generation, None
+        return generation, body
+
+    async def store(
+        self, key: str, generation: bytes, variants: Dict[str, bytes]
+    ) -> None:
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for encoding, body in variants.items():
+                    pipe.set(
+                        self._key(key, encoding),
+                        generation + b"|" + body,
+                        ex=settings.schedule_cache_ttl_seconds,
+                    )
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Schedule cache store failed", exc_info=True)
+
+
+async def get_schedule_generation(redis: Redis) -> Optional[str]:
+    """
+    Current timetable generation; bumped on every schedule change. None
+    when Redis is unavailable, so callers can't tell whether it changed.
+    """
+    try:
+        return await redis.get(SCHEDULE_GENERATION_KEY) or "0"
+    except RedisError:
+        logger.warning("Schedule generation lookup failed", exc_info=True)
+        return None
+
+
+async def apply_invalidations(
+    user_ids: Set[int], shared: bool = False, schedules: bool = False
+) -> None:
+    cache = ProfileCache(redis_client)
+    try:
+        if schedules:
+            await redis_client.incr(SCHEDULE_GENERATION_KEY)
+        if shared or schedules:
+            await cache.invalidate_all()
+        else:
+            await cache.invalidate_users(user_ids)
+    except RedisError:
+        # Entries still expire through their TTL
+        logger.warning("Cache invalidation failed", exc_info=True)
+
+
+def schedule_invalidation(
+    user_ids: Set[int], shared: bool = False, schedules: bool = False
+) -> None:
+    """Fire-and-forget invalidation, usable from sync ORM event handlers"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(apply_invalidations(user_ids, shared, schedules))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+# -------------------------------
+# ORM change tracking
+# -------------------------------
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    pending = session.info.setdefault(
+        _PENDING_KEY, {"users": set(), "shared": False, "schedules": False}
+    )
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, User):
+            pending["users"].add(obj.id)
+        elif isinstance(obj, USER_SCOPED_MODELS):
+            pending["users"].add(obj.user_id)
+        elif isinstance(obj, SHARED_MODELS):
+            pending["shared"] = True
+        elif isinstance(obj, SCHEDULE_MODELS):
+            pending["schedules"] = True
+        if isinstance(obj, SCHEDULE_EMBEDDED_MODELS):
+            pending["schedules"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending and (pending["users"] or pending["shared"] or pending["schedules"]):
+        schedule_invalidation(
+            pending["users"], pending["shared"], pending["schedules"]
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
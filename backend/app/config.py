@@ -1,12 +1,70 @@
 # app/config.py
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     database_url: str
+    database_replica_url: Optional[str] = None  # uncached read-only GET routes use it
+    replica_read_your_writes_seconds: int = 5  # reads stay on primary after a write
+
+    # Connection pool, per uvicorn worker
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100  # asyncpg prepared statements per connection
+
+    # Slow query log, readable at /debug/slow-queries
+    slow_query_threshold_ms: float = 200.0
+    slow_query_explain_sample_rate: float = 0.1  # share of slow SELECTs re-planned
+    slow_query_log_size: int = 100
+
+    # Redis; the pool is bounded and callers wait up to redis_pool_timeout
+    redis_url: str = "redis://redis-backend:6379/0"
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 2.0
+    redis_socket_timeout: float = 1.0
+    redis_socket_connect_timeout: float = 1.0
+    redis_health_check_interval: int = 30  # seconds between idle connection checks
+    redis_retry_attempts: int = 2
+    redis_retry_backoff_base: float = 0.01
+    redis_retry_backoff_cap: float = 0.2
 
     access_token_expire_hours: int = 24  # extended lifetime
     secret_key: str
 
+    # Password hashing runs in a worker pool so logins don't block the event loop
+    password_hash_workers: int = 2
+    password_hash_use_processes: bool = False  # threads are enough for argon2/bcrypt
+
+    profile_cache_ttl_seconds: int = 600  # safety net for changes made outside the ORM
+    # Schedule responses are cached with precompressed gzip/brotli variants
+    schedule_cache_ttl_seconds: int = 600
+    schedule_cache_gzip_level: int = 9  # compressed once per miss, served many times
+    schedule_cache_brotli_quality: int = 9
+
+    # Startup warmup; /health reports 503 until the required steps succeed
+    warmup_step_timeout_seconds: float = 10.0
+    warmup_retry_interval_seconds: float = 5.0
+
+    log_level: str = "INFO"
+    # Share of requests that get SQL/Redis counters, Server-Timing and a log line
+    request_instrumentation_sample_rate: float = 1.0
+
+    # Opt-in per-request profiling for administrators (X-Profile: 1 or ?profile=1)
+    profiling_enabled: bool = False
+    profiling_dir: str = "/tmp/attentify-profiles"
+    profiling_max_artifacts: int = 20
+    profiling_interval_seconds: float = 0.001
+
+    # Prometheus scrapes /metrics with "Authorization: Bearer <token>"; the
+    # endpoint is disabled while no token is set
+    prometheus_scrape_token: Optional[str] = None
+    # With several workers, how often each one publishes its pool gauges
+    prometheus_pool_refresh_seconds: float = 5.0
+
 
 settings = Settings()  # type: ignore
@@ -1,15 +1,146 @@
 # app/database.py
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
+from app.instrumentation import record_query
+from app.slow_queries import slow_query_log
 
 from collections.abc import AsyncGenerator
 
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    checkout_wait_total_seconds: float = 0.0
+    checkout_wait_max_seconds: float = 0.0
+    queries: int = 0
+    query_total_seconds: float = 0.0
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started_at
+            pool_stats.checkouts += 1
+            pool_stats.checkout_wait_total_seconds += waited
+            pool_stats.checkout_wait_max_seconds = max(
+                pool_stats.checkout_wait_max_seconds, waited
+            )
+
+
+def _engine_options(database_url: str) -> dict:
+    options = dict(
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    if make_url(database_url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_statement_cache_size
+        }
+    return options
+
+
+def _instrument_queries(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        # Kept on the execution context, which is dropped with the statement
+        # even when it fails and after_cursor_execute never runs
+        context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - context._query_started_at
+        pool_stats.queries += 1
+        pool_stats.query_total_seconds += elapsed
+        record_query(elapsed)
+        slow_query_log.record(engine, statement, parameters, elapsed, many)
+
+
 # Create the async engine with our DATABASE_URL
-engine = create_async_engine(settings.database_url, echo=False)
+engine = create_async_engine(
+    settings.database_url, **_engine_options(settings.database_url)
+)
+_instrument_queries(engine)
+
+# Optional read replica; without one, reads share the primary engine
+if settings.database_replica_url:
+    replica_engine = create_async_engine(
+        settings.database_replica_url,
+        **_engine_options(settings.database_replica_url),
+    )
+    _instrument_queries(replica_engine)
+else:
+    replica_engine = engine
 
 # Create a session maker bound to the engine
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async_read_session = sessionmaker(
+    replica_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+# Read-your-writes escape hatch: set after a write, or sent explicitly by clients
+READ_PRIMARY_COOKIE = "read_primary"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+# Values of the cookie or header that mean "read from the primary"
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def _pool_gauges(pool) -> dict:
+    return dict(
+        pool_size=pool.size(),
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        overflow=max(pool.overflow(), 0),
+    )
+
+
+def get_pool_metrics() -> dict:
+    """Pool gauges and query counters for this worker"""
+    metrics = asdict(pool_stats)
+    metrics.update(
+        _pool_gauges(engine.pool),
+        max_overflow=settings.db_max_overflow,
+        checkout_wait_avg_seconds=(
+            pool_stats.checkout_wait_total_seconds / pool_stats.checkouts
+            if pool_stats.checkouts
+            else 0.0
+        ),
+    )
+    if replica_engine is not engine:
+        metrics["replica"] = _pool_gauges(replica_engine.pool)
+    return metrics
+
+
+def mark_read_your_writes(response: Response) -> None:
+    """Route this client's reads to the primary until the replica catches up"""
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        "1",
+        max_age=settings.replica_read_your_writes_seconds,
+        httponly=True,
+        samesite="lax",
+    )
 
 
 # Dependency (for use in route handlers)
@@ -21,3 +152,21 @@ async def get_db():
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
+
+
+def _is_true(value: Optional[str]) -> bool:
+    return value is not None and value.strip().lower() in _TRUE_VALUES
+
+
+def read_session_maker(request: Request) -> sessionmaker:
+    """Replica sessions, unless the client has to read its own writes"""
+    read_primary = _is_true(request.cookies.get(READ_PRIMARY_COOKIE)) or _is_true(
+        request.headers.get(READ_PRIMARY_HEADER)
+    )
+    return async_session if read_primary else async_read_session
+
+
+# Dependency for read-only routes
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with read_session_maker(request)() as session:
+        yield session
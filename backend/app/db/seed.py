@@ -1,8 +1,11 @@
 # app/db/seed.py
+from dataclasses import dataclass
 from datetime import datetime, time
 from typing import Any
-from sqlalchemy import insert, select
+from sqlalchemy import or_, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import apply_invalidations
 from app.models import Role, Site, LessonPeriod, WeekType, DayOfWeek, LessonType
 
 
@@ -116,40 +119,100 @@ DEFAULT_LESSON_TYPES = [
 ]
 
 
-async def seed_model(
-    db: AsyncSession, model: Any, defaults: list[dict], unique_fields: list[str]
-):
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+def _dialect_insert(db: AsyncSession):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise RuntimeError(f"Upsert is not supported on {dialect}")
+
+
+async def upsert_rows(
+    db: AsyncSession,
+    model: Any,
+    rows: list[dict],
+    conflict_field: str,
+    chunk_size: int = 1000,
+) -> UpsertResult:
     """
-    Seed a database table with default data if it doesn't exist
+    INSERT ... ON CONFLICT (conflict_field) DO UPDATE in chunks.
+
+    conflict_field must carry a unique constraint. Rows whose values already
+    match are left alone by the WHERE clause, so only inserted and changed
+    rows come back from RETURNING. Nothing is committed here; the caller
+    owns the transaction.
     """
-    # Check existing entries using SQLAlchemy model attributes
-    existing = await db.execute(select(model))
-    existing_entries = existing.scalars().all()
-
-    # Create set of existing unique field combinations
-    existing_values = {
-        tuple(getattr(entry, field) for field in unique_fields)
-        for entry in existing_entries
-    }
-
-    # Filter out existing entries
-    new_entries = [
-        entry
-        for entry in defaults
-        if tuple(entry[field] for field in unique_fields) not in existing_values
+    table = model.__table__
+    key_column = table.c[conflict_field]
+    # The same key twice in one statement is an error; the last one wins
+    rows = list({row[conflict_field]: row for row in rows}.values())
+    result = UpsertResult()
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        keys = [row[conflict_field] for row in chunk]
+        existing = set(
+            (await db.execute(select(key_column).where(key_column.in_(keys))))
+            .scalars()
+            .all()
+        )
+
+        stmt = _dialect_insert(db)(table).values(chunk)
+        update_columns = [name for name in chunk[0] if name != conflict_field]
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[key_column],
+                set_={name: stmt.excluded[name] for name in update_columns},
+                where=or_(
+                    *(
+                        table.c[name].is_distinct_from(stmt.excluded[name])
+                        for name in update_columns
+                    )
+                ),
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[key_column])
+
+        written = (await db.execute(stmt.returning(key_column))).scalars().all()
+        inserted = sum(1 for key in written if key not in existing)
+        result.inserted += inserted
+        result.updated += len(written) - inserted
+        result.unchanged += len(chunk) - len(written)
+
+    return result
+
+
+async def seed_all_models(db: AsyncSession) -> dict[str, UpsertResult]:
+    """Upsert all constant data models in one transaction"""
+    seeds = [
+        (Role, DEFAULT_ROLES, "role_name_en"),
+        (Site, DEFAULT_SITES, "site_name_ru"),
+        (LessonPeriod, DEFAULT_LESSON_PERIODS, "lesson_number"),
+        (WeekType, DEFAULT_WEEK_TYPES, "name_en"),
+        (DayOfWeek, DEFAULT_DAYS_OF_WEEK, "day_number"),
+        (LessonType, DEFAULT_LESSON_TYPES, "name_en"),
     ]
-
-    # Insert new entries
-    if new_entries:
-        await db.execute(insert(model).values(new_entries))
+    results = {}
+    try:
+        for model, defaults, conflict_field in seeds:
+            results[model.__tablename__] = await upsert_rows(
+                db, model, defaults, conflict_field
+            )
         await db.commit()
-
-
-async def seed_all_models(db: AsyncSession):
-    """Seed all constant data models"""
-    await seed_model(db, Role, DEFAULT_ROLES, ["role_name_ru", "role_name_en"])
-    await seed_model(db, Site, DEFAULT_SITES, ["site_name_ru", "site_name_en"])
-    await seed_model(db, LessonPeriod, DEFAULT_LESSON_PERIODS, ["lesson_number"])
-    await seed_model(db, WeekType, DEFAULT_WEEK_TYPES, ["name_ru", "name_en"])
-    await seed_model(db, DayOfWeek, DEFAULT_DAYS_OF_WEEK, ["day_number"])
-    await seed_model(db, LessonType, DEFAULT_LESSON_TYPES, ["name_ru", "name_en"])
+    except Exception:
+        await db.rollback()
+        raise
+
+    if any(result.inserted or result.updated for result in results.values()):
+        # Core statements bypass the ORM change tracking in app.cache; days,
+        # periods, sites and lesson types are embedded in schedule responses
+        await apply_invalidations(set(), shared=True, schedules=True)
+    return results
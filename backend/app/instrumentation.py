@@ -0,0 +1,119 @@
+# app/instrumentation.py
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.requests")
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    redis_commands: int = 0
+    redis_seconds: float = 0.0
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None when it isn't sampled"""
+    return _current_stats.get()
+
+
+@contextmanager
+def capture_request_stats() -> Iterator[RequestStats]:
+    """Count queries and Redis commands made inside the block"""
+    stats = RequestStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def record_query(elapsed: float) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def record_redis(elapsed: float, commands: int = 1) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.redis_commands += commands
+        stats.redis_seconds += elapsed
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    return ", ".join(
+        [
+            f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries"',
+            f'redis;dur={stats.redis_seconds * 1000:.1f};desc="{stats.redis_commands} commands"',
+            f"total;dur={total_seconds * 1000:.1f}",
+        ]
+    )
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Counts SQL statements, DB time and Redis time for a sampled share of
+    requests. Results go out as a Server-Timing header and one structured
+    log line per request.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    server_timing(stats, time.perf_counter() - started_at),
+                )
+            await send(message)
+
+        with capture_request_stats() as stats:
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                logger.info(
+                    json.dumps(
+                        {
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "status": status_code,
+                            "duration_ms": round(
+                                (time.perf_counter() - started_at) * 1000, 2
+                            ),
+                            "db_queries": stats.db_queries,
+                            "db_ms": round(stats.db_seconds * 1000, 2),
+                            "redis_commands": stats.redis_commands,
+                            "redis_ms": round(stats.redis_seconds * 1000, 2),
+                        }
+                    )
+                )
@@ -1,6 +1,8 @@
 # app/main.py
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.auth import (
@@ -8,21 +10,66 @@ from app.auth import (
     auth_jwt_backend,
     auth_cookie_backend,
 )
+from app.config import settings
 from app.global_schemas import UserRead, UserUpdate
-from app.routers import schedule, profile, session, attendance, debug
+from app.instrumentation import RequestInstrumentationMiddleware
+from app.passwords import password_helper
+from app.profiling import ProfilerMiddleware
+from app.prometheus import (
+    MULTIPROCESS_DIR,
+    PrometheusMiddleware,
+    mark_process_dead,
+    publish_pool_gauges,
+)
+from app.redis import close_redis
+from app.routers import (
+    schedule,
+    profile,
+    session,
+    attendance,
+    debug,
+    metrics,
+    reports,
+    timetable,
+)
+from app.warmup import Warmup
+
+logging.basicConfig(level=settings.log_level)
+
+
+warmup = Warmup()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Warm the worker before it accepts traffic; keep retrying in the
+    # background if a dependency isn't up yet.
+    tasks = []
+    if not await warmup.run():
+        tasks.append(asyncio.create_task(warmup.run_until_ready()))
+    if MULTIPROCESS_DIR:
+        tasks.append(asyncio.create_task(publish_pool_gauges()))
+
     yield
 
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    password_helper.shutdown()
+    await close_redis()
+    mark_process_dead()
+
 
 app = FastAPI(root_path="/api", lifespan=lifespan)
 
 
 @app.get("/health")
-async def health_check():
-    return {"status": "ok"}
+async def health_check(response: Response):
+    if not warmup.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "warming_up", "steps": warmup.steps}
+    return {"status": "ok", "steps": warmup.steps}
 
 
 app.add_middleware(
@@ -31,8 +78,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Id"],
 )
 
+if settings.profiling_enabled:
+    app.add_middleware(ProfilerMiddleware)
+
+app.add_middleware(PrometheusMiddleware)
+
+if settings.request_instrumentation_sample_rate > 0:
+    app.add_middleware(
+        RequestInstrumentationMiddleware,
+        sample_rate=settings.request_instrumentation_sample_rate,
+    )
+
 app.include_router(
     app_fastapi_users.get_auth_router(auth_jwt_backend),
     prefix="/auth/jwt",
@@ -69,3 +128,9 @@ app.include_router(session.router)
 app.include_router(attendance.router)
 
 app.include_router(debug.router)
+
+app.include_router(timetable.router)
+app.include_router(reports.router)
+
+app.include_router(metrics.router)
+app.include_router(metrics.prometheus_router)
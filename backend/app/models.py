@@ -8,6 +8,7 @@ from sqlalchemy import (
     ForeignKey,
     TIMESTAMP,
     Boolean,
+    Index,
     func,
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column, DeclarativeBase
@@ -168,7 +169,7 @@ class Student(ProfileMixin, Base):
     __tablename__ = "students"
 
     group_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("groups.id", ondelete="SET NULL"), nullable=True
+        ForeignKey("groups.id", ondelete="SET NULL"), nullable=True, index=True
     )
 
     group: Mapped[Optional["Group"]] = relationship("Group", back_populates="students")
@@ -232,6 +233,7 @@ class ScheduleGroup(Base):
         Integer,
         ForeignKey("groups.id", ondelete="CASCADE"),
         primary_key=True,
+        index=True,  # the primary key only covers lookups by schedule_id
     )
 
     term_schedule: Mapped["TermSchedule"] = relationship(
@@ -242,13 +244,26 @@ class ScheduleGroup(Base):
 
 class Attendance(IdMixin, Base):
     __tablename__ = "attendance"
+    __table_args__ = (
+        Index(
+            "ix_attendance_schedule_id_lesson_date_student_id",
+            "schedule_id",
+            "lesson_date",
+            "student_id",
+        ),
+        # Keyset order of the attendance report
+        Index("ix_attendance_lesson_date_id", "lesson_date", "id"),
+    )
 
     schedule_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("term_schedule.id", ondelete="CASCADE"), nullable=False
     )
     lesson_date: Mapped[date] = mapped_column(Date, nullable=False)
     student_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("students.id", ondelete="CASCADE"), nullable=False
+        Integer,
+        ForeignKey("students.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     scanned_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, server_default=func.current_timestamp(), nullable=False
@@ -374,6 +389,15 @@ class LessonType(IdMixin, Base):
 
 class TermSchedule(IdMixin, Base):
     __tablename__ = "term_schedule"
+    __table_args__ = (
+        Index(
+            "ix_term_schedule_term_id_week_type_id_day_of_week_id",
+            "term_id",
+            "week_type_id",
+            "day_of_week_id",
+        ),
+        Index("ix_term_schedule_teacher_id_subject_id", "teacher_id", "subject_id"),
+    )
 
     term_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("terms.id", ondelete="CASCADE"), nullable=False
@@ -0,0 +1,188 @@
+# app/passwords.py
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from fastapi_users.password import PasswordHelper
+
+from app.config import settings
+from app.prometheus import PASSWORD_QUEUE_WAIT
+
+# Plain synchronous helper; only ever called from inside the worker pool
+_helper = PasswordHelper()
+
+T = TypeVar("T")
+# ("hash", password) or ("verify_and_update", plain_password, hashed_password)
+PasswordJob = Tuple[str, ...]
+
+
+def _hash(password: str) -> str:
+    return _helper.hash(password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return _helper.verify_and_update(plain_password, hashed_password)
+
+
+def _timed_call(
+    submitted_at: float, func: Callable[..., Any], *args: Any
+) -> Tuple[float, Any]:
+    """Runs in the worker and reports how long the job sat in the queue"""
+    started_at = time.monotonic()
+    return started_at - submitted_at, func(*args)
+
+
+_JOBS: Dict[str, Callable[..., Any]] = {
+    "hash": _hash,
+    "verify_and_update": _verify_and_update,
+}
+
+
+class PasswordJobPending(Exception):
+    """A DeferredPasswordHelper result the pool hasn't computed yet"""
+
+    def __init__(self, job: PasswordJob):
+        super().__init__(job[0])
+        self.job = job
+
+
+class DeferredPasswordHelper:
+    """
+    Synchronous password helper for fastapi-users' BaseUserManager that
+    never hashes on the calling thread.
+
+    Results come from `results`, filled in by
+    PooledPasswordHelper.run_deferred. Asking for one that isn't there
+    raises PasswordJobPending so the pool can compute it and the operation
+    be retried.
+    """
+
+    def __init__(self):
+        self.results: Dict[PasswordJob, Any] = {}
+
+    def _result(self, job: PasswordJob) -> Any:
+        try:
+            return self.results[job]
+        except KeyError:
+            raise PasswordJobPending(job)
+
+    def hash(self, password: str) -> str:
+        return self._result(("hash", password))
+
+    def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return self._result(("verify_and_update", plain_password, hashed_password))
+
+    def generate(self) -> str:
+        # Stable across retries, so its hash is found on the next attempt
+        return self.results.setdefault(("generate",), _helper.generate())
+
+
+@dataclass
+class PasswordPoolStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    queue_wait_total_seconds: float = 0.0
+    queue_wait_max_seconds: float = 0.0
+
+
+class PooledPasswordHelper:
+    """
+    Runs password hashing and verification in a bounded worker pool
+    so argon2/bcrypt never block the event loop.
+    """
+
+    def __init__(self, max_workers: int, use_processes: bool = False):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.stats = PasswordPoolStats()
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            executor_class = (
+                ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            )
+            self._executor = executor_class(max_workers=self.max_workers)
+        return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        self.stats.submitted += 1
+        self.stats.in_flight += 1
+        try:
+            queue_wait, result = await loop.run_in_executor(
+                self._get_executor(), _timed_call, time.monotonic(), func, *args
+            )
+        except Exception:
+            self.stats.failed += 1
+            raise
+        finally:
+            self.stats.in_flight -= 1
+
+        self.stats.completed += 1
+        PASSWORD_QUEUE_WAIT.observe(queue_wait)
+        self.stats.queue_wait_total_seconds += queue_wait
+        self.stats.queue_wait_max_seconds = max(
+            self.stats.queue_wait_max_seconds, queue_wait
+        )
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(_verify_and_update, plain_password, hashed_password)
+
+    def generate(self) -> str:
+        return _helper.generate()
+
+    async def run_deferred(
+        self, helper: DeferredPasswordHelper, operation: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Run a user manager operation whose password helper is `helper`. Each
+        hash or verification it asks for is computed in the pool and the
+        operation retried with the result. BaseUserManager only writes after
+        its password work, so a retry repeats reads only.
+        """
+        # Results never carry over between operations: each hash is fresh,
+        # including the one run against timing attacks on a failed login
+        helper.results.clear()
+        while True:
+            try:
+                return await operation()
+            except PasswordJobPending as pending:
+                kind, *args = pending.job
+                helper.results[pending.job] = await self._run(_JOBS[kind], *args)
+
+    def snapshot(self) -> dict:
+        stats = asdict(self.stats)
+        stats["max_workers"] = self.max_workers
+        stats["executor"] = "process" if self.use_processes else "thread"
+        stats["queue_wait_avg_seconds"] = (
+            self.stats.queue_wait_total_seconds / self.stats.completed
+            if self.stats.completed
+            else 0.0
+        )
+        return stats
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_helper = PooledPasswordHelper(
+    max_workers=settings.password_hash_workers,
+    use_processes=settings.password_hash_use_processes,
+)
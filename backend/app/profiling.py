@@ -0,0 +1,153 @@
+# app/profiling.py
+import re
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from fastapi_users.db import SQLAlchemyUserDatabase
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth import (
+    UserManager,
+    cookie_transport,
+    get_current_active_administrator,
+    get_jwt_strategy,
+)
+from app.config import settings
+from app.database import async_session
+from app.models import Administrator, User
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+ARTIFACT_SUFFIX = ".speedscope.json"
+_ARTIFACT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _profiling_requested(request: Request) -> bool:
+    return (
+        request.headers.get(PROFILE_HEADER) == "1"
+        or request.query_params.get(PROFILE_QUERY_PARAM) == "1"
+    )
+
+
+def _extract_token(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token
+    return request.cookies.get(cookie_transport.cookie_name)
+
+
+async def _get_administrator(request: Request) -> Optional[Administrator]:
+    token = _extract_token(request)
+    if not token:
+        return None
+
+    async with async_session() as db:
+        user_manager = UserManager(SQLAlchemyUserDatabase(db, User))
+        user = await get_jwt_strategy().read_token(token, user_manager)
+        if user is None or not user.is_active:
+            return None
+        try:
+            return await get_current_active_administrator(user, db)
+        except HTTPException:
+            return None
+
+
+class ProfileStore:
+    """Keeps the newest speedscope artifacts in a bounded local directory"""
+
+    def __init__(self, directory: str, max_artifacts: int):
+        self.directory = Path(directory)
+        self.max_artifacts = max_artifacts
+
+    def path_for(self, artifact_id: str) -> Optional[Path]:
+        if not _ARTIFACT_ID.match(artifact_id):
+            return None
+        path = self.directory / f"{artifact_id}{ARTIFACT_SUFFIX}"
+        return path if path.is_file() else None
+
+    def list_ids(self) -> List[str]:
+        return [
+            path.name.removesuffix(ARTIFACT_SUFFIX) for path in self._artifacts()
+        ]
+
+    def save(self, artifact_id: str, content: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{artifact_id}{ARTIFACT_SUFFIX}").write_text(content)
+        for stale in self._artifacts()[self.max_artifacts :]:
+            stale.unlink(missing_ok=True)
+
+    def _artifacts(self) -> List[Path]:
+        """Newest first"""
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            self.directory.glob(f"*{ARTIFACT_SUFFIX}"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+
+
+profile_store = ProfileStore(settings.profiling_dir, settings.profiling_max_artifacts)
+
+
+class ProfilerMiddleware:
+    """
+    Runs a request under pyinstrument when an administrator sends
+    "X-Profile: 1" or "?profile=1". The speedscope artifact id comes back
+    in the X-Profile-Id header. Other requests only pay for the flag check.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        if not _profiling_requested(request):
+            await self.app(scope, receive, send)
+            return
+
+        if await _get_administrator(request) is None:
+            response = JSONResponse(
+                {"detail": "Profiling is only available to administrators."},
+                status_code=403,
+            )
+            await response(scope, receive, send)
+            return
+
+        # Imported lazily so the profiler is never loaded unless it's used
+        from pyinstrument import Profiler
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        artifact_id = uuid.uuid4().hex
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, artifact_id)
+            await send(message)
+
+        profiler = Profiler(
+            interval=settings.profiling_interval_seconds, async_mode="enabled"
+        )
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+
+            def render_and_save() -> None:
+                profile_store.save(artifact_id, profiler.output(SpeedscopeRenderer()))
+
+            # Rendering a profile takes long enough to stall every other request
+            await run_in_threadpool(render_and_save)
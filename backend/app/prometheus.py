@@ -0,0 +1,190 @@
+# app/prometheus.py
+import asyncio
+import os
+import time
+from typing import Iterator, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+# With several uvicorn workers every process writes its samples to
+# PROMETHEUS_MULTIPROC_DIR and the scrape aggregates them.
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROCESS_DIR:
+    # Scripts run outside the container CMD that prepares the directory
+    os.makedirs(MULTIPROCESS_DIR, exist_ok=True)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+ATTENDANCE_CONFIRMS = Counter(
+    "attendance_confirm_total",
+    "Attendance confirmations by outcome",
+    ["outcome"],
+)
+PASSWORD_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time password jobs wait for a free worker",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+REDIS_COMMAND_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Latency of Redis commands and pipelines",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+
+POOL_GAUGES = {
+    "db_pool_checked_out": "Database connections in use",
+    "db_pool_checked_in": "Idle database connections in the pool",
+    "db_pool_overflow": "Database connections opened beyond the pool size",
+    "redis_pool_in_use": "Redis connections in use",
+    "redis_pool_available": "Idle Redis connections in the pool",
+}
+
+
+def _pool_samples() -> Iterator[Tuple[str, str, float]]:
+    """(gauge, pool, value) for every connection pool of this process"""
+    from app.database import engine, replica_engine
+    from app.redis import redis_clients
+
+    db_pools = {"primary": engine.pool}
+    if replica_engine is not engine:
+        db_pools["replica"] = replica_engine.pool
+    for name, pool in db_pools.items():
+        yield "db_pool_checked_out", name, pool.checkedout()
+        yield "db_pool_checked_in", name, pool.checkedin()
+        yield "db_pool_overflow", name, max(pool.overflow(), 0)
+
+    for name, client in redis_clients.items():
+        in_use, available = client.connection_pool.usage()
+        yield "redis_pool_in_use", name, in_use
+        yield "redis_pool_available", name, available
+
+
+class PoolCollector:
+    """
+    Connection pool gauges, read when the registry is scraped instead of
+    being kept up to date on every request. Single process only: with
+    several workers the scrape reaches one of them, see
+    publish_pool_gauges.
+    """
+
+    def describe(self):
+        # Registration would otherwise call collect(), importing the engine
+        # while this module is still loading
+        return []
+
+    def collect(self):
+        families = {
+            name: GaugeMetricFamily(name, documentation, labels=["pool"])
+            for name, documentation in POOL_GAUGES.items()
+        }
+        for name, pool, value in _pool_samples():
+            families[name].add_metric([pool], value)
+        yield from families.values()
+
+
+if MULTIPROCESS_DIR:
+    # Summed over the live workers at scrape time
+    _pool_gauges = {
+        name: Gauge(name, documentation, ["pool"], multiprocess_mode="livesum")
+        for name, documentation in POOL_GAUGES.items()
+    }
+else:
+    REGISTRY.register(PoolCollector())
+
+
+def refresh_pool_gauges() -> None:
+    """Write this worker's pool usage where the multiprocess scrape reads it"""
+    for name, pool, value in _pool_samples():
+        _pool_gauges[name].labels(pool).set(value)
+
+
+async def publish_pool_gauges() -> None:
+    """
+    Runs in every worker in multiprocess mode, so each scrape sums the pools
+    of all workers, each at most prometheus_pool_refresh_seconds old.
+    """
+    while True:
+        refresh_pool_gauges()
+        await asyncio.sleep(settings.prometheus_pool_refresh_seconds)
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauge samples once it stops serving"""
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        refresh_pool_gauges()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def _route_template(scope: Scope) -> str:
+    """Route path like /teacher/schedule/day, so labels stay low-cardinality"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class PrometheusMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_LATENCY.labels(
+                scope["method"], _route_template(scope), str(status_code)
+            ).observe(time.perf_counter() - started_at)
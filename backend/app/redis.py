@@ -1,13 +1,178 @@
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Set, Tuple
+
 import redis.asyncio as redis
+from redis.asyncio import BlockingConnectionPool
+from redis.asyncio.client import Pipeline
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+
+from app.config import settings
+from app.instrumentation import record_redis
+from app.prometheus import REDIS_COMMAND_LATENCY
+
+
+@dataclass
+class RedisStats:
+    commands: int = 0
+    errors: int = 0
+    command_total_seconds: float = 0.0
+    command_max_seconds: float = 0.0
+
+
+redis_stats = RedisStats()
+
+
+def _record(elapsed: float, commands: int = 1, failed: bool = False) -> None:
+    redis_stats.commands += commands
+    redis_stats.command_total_seconds += elapsed
+    redis_stats.command_max_seconds = max(redis_stats.command_max_seconds, elapsed)
+    if failed:
+        redis_stats.errors += 1
+    REDIS_COMMAND_LATENCY.observe(elapsed)
+    record_redis(elapsed, commands)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        commands = len(self.command_stack)
+        started_at = time.perf_counter()
+        failed = False
+        try:
+            return await super().execute(raise_on_error)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            _record(time.perf_counter() - started_at, commands, failed)
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client that reports command counts and latency per request"""
+
+    async def execute_command(self, *args, **options):
+        started_at = time.perf_counter()
+        failed = False
+        try:
+            return await super().execute_command(*args, **options)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            _record(time.perf_counter() - started_at, failed=failed)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """
+    Blocking pool that keeps its own connection counts, so usage can be
+    reported without reading redis-py's private pool state.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._reset_counts()
+
+    def reset(self) -> None:
+        super().reset()
+        self._reset_counts()
+
+    def _reset_counts(self) -> None:
+        self.opened = 0
+        self._checked_out: Set[int] = set()
+
+    def make_connection(self):
+        self.opened += 1
+        return super().make_connection()
+
+    async def get_connection(self, *args, **kwargs):
+        connection = await super().get_connection(*args, **kwargs)
+        self._checked_out.add(id(connection))
+        return connection
+
+    async def release(self, connection) -> None:
+        # Also called for connections that failed their checkout
+        self._checked_out.discard(id(connection))
+        await super().release(connection)
+
+    def usage(self) -> Tuple[int, int]:
+        """(in use, idle) connections"""
+        in_use = len(self._checked_out)
+        return in_use, self.opened - in_use
+
+
+def create_connection_pool(
+    decode_responses: bool = True,
+) -> InstrumentedConnectionPool:
+    """Bounded pool: callers wait up to redis_pool_timeout for a free connection"""
+    return InstrumentedConnectionPool.from_url(
+        settings.redis_url,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+        health_check_interval=settings.redis_health_check_interval,
+        retry=Retry(
+            ExponentialBackoff(
+                cap=settings.redis_retry_backoff_cap,
+                base=settings.redis_retry_backoff_base,
+            ),
+            settings.redis_retry_attempts,
+        ),
+        retry_on_error=[ConnectionError, TimeoutError],
+        decode_responses=decode_responses,  # optional: to auto-decode byte responses to str
+    )
+
 
 # Create a global Redis client instance
-redis_client = redis.Redis(
-    host="redis-backend",
-    port=6379,
-    db=0,
-    decode_responses=True,  # optional: to auto-decode byte responses to str
+redis_client = InstrumentedRedis(connection_pool=create_connection_pool())
+# Same server without decoding, for binary values such as compressed bodies
+redis_binary_client = InstrumentedRedis(
+    connection_pool=create_connection_pool(decode_responses=False)
 )
 
 
+# Clients whose pools are reported, by label
+redis_clients: Dict[str, InstrumentedRedis] = {
+    "default": redis_client,
+    "binary": redis_binary_client,
+}
+
+
+def get_redis_metrics() -> dict:
+    in_use, available = redis_client.connection_pool.usage()
+    metrics = asdict(redis_stats)
+    metrics.update(
+        in_use=in_use,
+        available=available,
+        max_connections=settings.redis_max_connections,
+        utilization=in_use / settings.redis_max_connections,
+        command_avg_seconds=(
+            redis_stats.command_total_seconds / redis_stats.commands
+            if redis_stats.commands
+            else 0.0
+        ),
+    )
+    binary_in_use, binary_available = redis_binary_client.connection_pool.usage()
+    metrics["binary"] = {"in_use": binary_in_use, "available": binary_available}
+    return metrics
+
+
+async def close_redis() -> None:
+    for client in (redis_client, redis_binary_client):
+        await client.aclose()
+        await client.connection_pool.disconnect()
+
+
 async def get_redis_client():
     return redis_client
+
+
+async def get_redis_binary_client():
+    return redis_binary_client
@@ -1,11 +1,14 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_, select
+from sqlalchemy.orm import load_only
 from datetime import date, datetime, timezone
 from app.auth import get_current_active_student, get_current_active_teacher
-from app.database import get_async_session
+from app.database import get_async_session, get_read_db, mark_read_your_writes
 from app.models import Attendance, Group, ScheduleGroup, Student, TermSchedule
+from app.prometheus import ATTENDANCE_CONFIRMS
+from app.schemas.core import Lang
 from app.utils.decrypt import decrypt_payload
 from pydantic import BaseModel
 from starlette import status
@@ -31,6 +34,7 @@ class StudentAttendanceResponse(BaseModel):
 @router.post("/confirm", status_code=status.HTTP_201_CREATED)
 async def confirm_attendance(
     data: QRScanData,
+    response: Response,
     session: AsyncSession = Depends(get_async_session),
     current_user: Student = Depends(get_current_active_student),
     redis: Redis = Depends(get_redis_client),
@@ -39,6 +43,7 @@ async def confirm_attendance(
         # Retrieve session key from Redis via teacher_id
         session_key = await redis.get(f"session:{data.teacher_id}")
         if not session_key:
+            ATTENDANCE_CONFIRMS.labels("no_session").inc()
             raise HTTPException(
                 status_code=404, detail="Session key not found for this teacher"
             )
@@ -51,6 +56,7 @@ async def confirm_attendance(
         timestamp = payload.get("timestamp")
 
         if not schedule_id or not timestamp:
+            ATTENDANCE_CONFIRMS.labels("invalid").inc()
             raise HTTPException(status_code=400, detail="Invalid QR data")
 
         # Confirm timestamp freshness (max 5 minutes)
@@ -58,6 +64,7 @@ async def confirm_attendance(
         now = datetime.now(timezone.utc)
         time_diff = abs((now - qr_time).total_seconds())
         if time_diff > 10:
+            ATTENDANCE_CONFIRMS.labels("expired").inc()
             raise HTTPException(status_code=400, detail="QR code expired")
 
         # Check if schedule exists for today
@@ -68,6 +75,7 @@ async def confirm_attendance(
         schedule = result.scalar_one_or_none()
 
         if not schedule:
+            ATTENDANCE_CONFIRMS.labels("no_schedule").inc()
             raise HTTPException(status_code=404, detail="Schedule not found for today")
 
         # Check if attendance already recorded
@@ -81,6 +89,7 @@ async def confirm_attendance(
         existing_record = result.scalar_one_or_none()
 
         if existing_record:
+            ATTENDANCE_CONFIRMS.labels("duplicate").inc()
             raise HTTPException(status_code=409, detail="Attendance already confirmed")
 
         # Create new attendance record
@@ -92,10 +101,13 @@ async def confirm_attendance(
         )
         session.add(new_record)
         await session.commit()
+        mark_read_your_writes(response)
+        ATTENDANCE_CONFIRMS.labels("success").inc()
 
         return {"detail": "Attendance confirmed successfully"}
 
     except ValueError:
+        ATTENDANCE_CONFIRMS.labels("decrypt_failure").inc()
         raise HTTPException(status_code=400, detail="Failed to decrypt QR data")
 
 
@@ -114,7 +126,8 @@ async def confirm_attendance(
 async def get_attendance_for_day(
     subject_id: int = Query(..., description="Subject ID"),
     lesson_date: date = Query(..., description="Lesson date in YYYY-MM-DD format"),
-    db: AsyncSession = Depends(get_async_session),
+    lang: Lang = Query("en", description="Locale of student and group names"),
+    db: AsyncSession = Depends(get_read_db),
     current_teacher=Depends(get_current_active_teacher),
 ):
     # Fetch schedules for this teacher, subject and date
@@ -135,6 +148,7 @@ async def get_attendance_for_day(
     # Fetch all related groups via ScheduleGroup
     group_stmt = (
         select(Group)
+        .options(load_only(Group.id, getattr(Group, f"group_name_{lang}")))
         .join(ScheduleGroup)
         .where(ScheduleGroup.schedule_id.in_(schedule_ids))
         .distinct()
@@ -146,9 +160,20 @@ async def get_attendance_for_day(
         raise HTTPException(status_code=404, detail="No groups found.")
 
     group_ids = [g.id for g in groups]
-
-    # Fetch all students in those groups
-    students_stmt = select(Student).where(Student.group_id.in_(group_ids))
+    group_names = {g.id: getattr(g, f"group_name_{lang}") for g in groups}
+
+    # Fetch all students in those groups, with only the columns listed
+    students_stmt = (
+        select(Student)
+        .options(
+            load_only(
+                Student.group_id,
+                getattr(Student, f"first_name_{lang}"),
+                getattr(Student, f"last_name_{lang}"),
+            )
+        )
+        .where(Student.group_id.in_(group_ids))
+    )
     students_result = await db.execute(students_stmt)
     students = students_result.scalars().all()
 
@@ -174,9 +199,9 @@ async def get_attendance_for_day(
         response.append(
             StudentAttendanceResponse(
                 student_id=student.id,
-                first_name=student.first_name_en,
-                last_name=student.last_name_en,
-                group_name=student.group.group_name_en if student.group else None,
+                first_name=getattr(student, f"first_name_{lang}"),
+                last_name=getattr(student, f"last_name_{lang}"),
+                group_name=group_names.get(student.group_id),
                 attended=attended,
             )
         )
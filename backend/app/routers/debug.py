@@ -1,45 +1,97 @@
-from datetime import date, datetime
-from fastapi import APIRouter, Depends, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from redis.asyncio import Redis
 from sqlalchemy import delete, select
-from app.models import Attendance
+from app.auth import get_current_active_administrator
+from app.models import Attendance, Teacher
+from app.profiling import profile_store
+from app.slow_queries import slow_query_log
 from app.redis import get_redis_client
-from app.database import get_async_session
+from app.database import get_async_session, get_read_db
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/debug", tags=["debug"])
 
+# Value and TTL of every key passed, as a flat [value, ttl, ...] list, so a
+# page costs one command however many keys SCAN returned
+SESSION_PAGE_SCRIPT = """
+local result = {}
+for i, key in ipairs(KEYS) do
+    result[2 * i - 1] = redis.call('GET', key)
+    result[2 * i] = redis.call('TTL', key)
+end
+return result
+"""
+
+
+class SessionEntry(BaseModel):
+    user_id: int
+    teacher_id: Optional[int]
+    teacher_name: Optional[str]
+    session_key: str
+    ttl_seconds: int
 
-@router.get("/sessions")
-async def list_all_session_keys(
-    redis: Redis = Depends(get_redis_client),
-):
-    keys = await redis.keys("session:*")
-    sessions = {}
-    for key in keys:
-        value = await redis.get(key)
-        sessions[key] = value  # both are str if decode_responses=True
-    return sessions
 
+class SessionPage(BaseModel):
+    sessions: List[SessionEntry]
+    next_cursor: Optional[int]  # None once the keyspace has been walked
 
-# Pydantic model to serialize attendance record
-class AttendanceRecord(BaseModel):
-    id: int
-    schedule_id: int
-    lesson_date: date
-    student_id: int
-    scanned_at: datetime
 
-    class Config:
-        orm_mode = True
+@router.get(
+    "/sessions",
+    response_model=SessionPage,
+    summary="Page through active teacher session keys",
+    dependencies=[Depends(get_current_active_administrator)],
+)
+async def list_session_keys(
+    cursor: int = Query(0, ge=0, description="Cursor from the previous page"),
+    count: int = Query(100, ge=1, le=1000, description="SCAN batch size hint"),
+    redis: Redis = Depends(get_redis_client),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Walks `session:{user_id}` keys with SCAN, so Redis is never blocked on
+    the whole keyspace. A page may hold fewer or more than `count` entries;
+    keep passing `next_cursor` until it is null.
+    """
+    next_cursor, keys = await redis.scan(
+        cursor=cursor, match="session:*", count=count
+    )
+    if not keys:
+        return SessionPage(sessions=[], next_cursor=next_cursor or None)
+
+    page = await redis.register_script(SESSION_PAGE_SCRIPT)(keys=keys)
+    values, ttls = page[0::2], page[1::2]
 
+    user_ids = [int(key.split(":", 1)[1]) for key in keys]
+    result = await db.execute(
+        select(
+            Teacher.user_id, Teacher.id, Teacher.last_name_en, Teacher.first_name_en
+        ).where(Teacher.user_id.in_(user_ids))
+    )
+    teachers = {
+        user_id: (teacher_id, f"{last_name} {first_name}")
+        for user_id, teacher_id, last_name, first_name in result.all()
+    }
 
-@router.get("/all", response_model=list[AttendanceRecord])
-async def list_all_attendance(session: AsyncSession = Depends(get_async_session)):
-    result = await session.execute(select(Attendance))
-    records = result.scalars().all()
-    return records
+    sessions = []
+    for user_id, value, ttl in zip(user_ids, values, ttls):
+        # The key may expire between SCAN and MGET
+        if value is None:
+            continue
+        teacher_id, teacher_name = teachers.get(user_id, (None, None))
+        sessions.append(
+            SessionEntry(
+                user_id=user_id,
+                teacher_id=teacher_id,
+                teacher_name=teacher_name,
+                session_key=value,
+                ttl_seconds=ttl,
+            )
+        )
+    return SessionPage(sessions=sessions, next_cursor=next_cursor or None)
 
 
 @router.delete("/clear-attendance", status_code=status.HTTP_204_NO_CONTENT)
@@ -47,3 +99,33 @@ async def clear_all_attendance(session: AsyncSession = Depends(get_async_session
     await session.execute(delete(Attendance))
     await session.commit()
     return {"detail": "All attendance records cleared successfully."}
+
+
+@router.get(
+    "/profiles",
+    summary="List stored request profiles, newest first",
+    dependencies=[Depends(get_current_active_administrator)],
+)
+async def list_profiles():
+    return {"profiles": profile_store.list_ids()}
+
+
+@router.get(
+    "/profiles/{artifact_id}",
+    summary="Download a speedscope profile captured with X-Profile: 1",
+    dependencies=[Depends(get_current_active_administrator)],
+)
+async def get_profile_artifact(artifact_id: str):
+    path = profile_store.path_for(artifact_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=path.name)
+
+
+@router.get(
+    "/slow-queries",
+    summary="Recent slow statements of this worker, newest first",
+    dependencies=[Depends(get_current_active_administrator)],
+)
+async def list_slow_queries():
+    return slow_query_log.entries()
@@ -0,0 +1,66 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+
+from app.auth import get_current_active_administrator
+from app.config import settings
+from app.database import get_pool_metrics
+from app.passwords import password_helper
+from app.prometheus import render_metrics
+from app.redis import get_redis_metrics
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(get_current_active_administrator)],
+)
+
+
+
+def require_scrape_token(request: Request) -> None:
+    """Prometheus can't log in as a user, so it sends a static bearer token"""
+    if not settings.prometheus_scrape_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        token.encode(), settings.prometheus_scrape_token.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+prometheus_router = APIRouter(
+    tags=["metrics"], dependencies=[Depends(require_scrape_token)]
+)
+
+
+@prometheus_router.get("/metrics", include_in_schema=False)
+async def get_prometheus_metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+@router.get(
+    "/passwords",
+    summary="Password hashing pool statistics for this worker",
+)
+async def get_password_pool_metrics():
+    return password_helper.snapshot()
+
+
+@router.get(
+    "/db",
+    summary="Database pool and query statistics for this worker",
+)
+async def get_db_pool_metrics():
+    return get_pool_metrics()
+
+
+@router.get(
+    "/redis",
+    summary="Redis pool utilization and command latency for this worker",
+)
+async def get_redis_pool_metrics():
+    return get_redis_metrics()
@@ -1,11 +1,15 @@
 # app/routers/profile.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 
+from app.cache import ProfileCache
 from app.database import get_db
-from app.models import User, Student
+from app.models import User
+from app.redis import get_redis_client
+from app.schemas.core import Lang
 from app.schemas.profile import UserProfileResponse
 from app.services.profile import ProfileService
 from app.auth import current_active_user
@@ -24,8 +28,12 @@ router = APIRouter(prefix="/profile", tags=["profile"])
     },
 )
 async def get_current_user_profile(
+    lang: Optional[Lang] = None,
+    # Only cache misses query, and they must read the primary: a lagging
+    # replica would store an old profile under the new generation
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(current_active_user),
+    redis: Redis = Depends(get_redis_client),
 ):
     """
     Get complete profile information for the authenticated user
@@ -35,23 +43,24 @@ async def get_current_user_profile(
     - Localized profile information (name, patronymic, phone)
     - Assigned role with descriptions
     - Associated groups (if teacher/student)
+
+    With **lang**, names come back as plain strings in that locale and
+    descriptions are left out.
+
+    The serialized response is cached per user in Redis and invalidated
+    whenever the user, profile, group membership or schedules change.
     """
+    cache = ProfileCache(redis)
+    generation, cached_body = await cache.lookup(current_user.id, lang)
+    if cached_body is not None:
+        return Response(content=cached_body, media_type="application/json")
+
     try:
-        # Refresh user with all necessary relationships
-        result = await db.execute(
-            select(User)
-            .options(
-                selectinload(User.role),
-                selectinload(User.teacher_profile),
-                selectinload(User.student_profile).selectinload(Student.group),
-                selectinload(User.administrator_profile),
-            )
-            .where(User.id == current_user.id)
-        )
-        user = result.scalar_one()
+        profile_service = ProfileService(db, redis, lang)
+        user = await profile_service.load_user(current_user.id)
 
         # Get processed profile through service layer
-        return await ProfileService(db).get_user_profile(user)
+        profile = await profile_service.get_user_profile(user)
 
     except ValueError as e:
         # Handle missing profile or data validation errors
@@ -62,3 +71,7 @@ async def get_current_user_profile(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Could not retrieve user profile: {e}",
         )
+
+    body = profile.model_dump_json()
+    await cache.store(current_user.id, generation, body, lang)
+    return Response(content=body, media_type="application/json")
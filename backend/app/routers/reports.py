@@ -0,0 +1,105 @@
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.auth import get_current_active_administrator
+from app.database import read_session_maker
+from app.services.attendance_report import (
+    AttendanceFilters,
+    AttendanceReport,
+    InvalidCursor,
+)
+
+router = APIRouter(
+    prefix="/reports",
+    tags=["reports"],
+    dependencies=[Depends(get_current_active_administrator)],
+)
+
+STREAM_BATCH_SIZE = 1000
+
+
+class AttendanceRecord(BaseModel):
+    id: int
+    lesson_date: date
+    scanned_at: datetime
+    schedule_id: int
+    student_id: int
+    group_id: Optional[int]
+    subject_id: int
+    term_id: int
+
+
+class AttendancePage(BaseModel):
+    records: List[AttendanceRecord]
+    next_cursor: Optional[str]  # None on the last page
+
+
+def attendance_filters(
+    term_id: Optional[int] = None,
+    group_id: Optional[int] = Query(None, description="Student's group"),
+    subject_id: Optional[int] = None,
+    date_from: Optional[date] = Query(None, description="Inclusive, YYYY-MM-DD"),
+    date_to: Optional[date] = Query(None, description="Inclusive, YYYY-MM-DD"),
+) -> AttendanceFilters:
+    return AttendanceFilters(
+        term_id=term_id,
+        group_id=group_id,
+        subject_id=subject_id,
+        date_from=date_from,
+        date_to=date_to,
+    )
+
+
+@router.get(
+    "/attendance",
+    response_model=AttendancePage,
+    summary="List attendance records, oldest lesson first",
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "A page of records, or every record with format=ndjson",
+        },
+        400: {"description": "Invalid cursor"},
+    },
+)
+async def list_attendance(
+    request: Request,
+    filters: AttendanceFilters = Depends(attendance_filters),
+    cursor: Optional[str] = Query(None, description="next_cursor of the last page"),
+    limit: int = Query(500, ge=1, le=5000),
+    format: Literal["json", "ndjson"] = "json",
+):
+    """
+    Attendance records ordered by (lesson_date, id), paginated by keyset.
+
+    - **cursor**: Continue after the last record of a previous page
+    - **format**: `ndjson` streams every matching record (after `cursor`,
+      if given) as one JSON object per line instead of returning a page
+    """
+    try:
+        report = AttendanceReport(filters, after=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Opened here rather than through get_read_db: the ndjson body outlives
+    # the request's dependencies and needs its own session
+    session_maker = read_session_maker(request)
+
+    if format == "json":
+        async with session_maker() as db:
+            rows, next_cursor = await report.page(db, limit)
+        return AttendancePage(
+            records=[AttendanceRecord(**row._mapping) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    async def ndjson():
+        async with session_maker() as session:
+            async for row in report.stream(session, STREAM_BATCH_SIZE):
+                yield AttendanceRecord(**row._mapping).model_dump_json() + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
@@ -1,45 +1,134 @@
-from typing import List, OrderedDict
+from typing import (
+    Awaitable,
+    Callable,
+    List,
+    Literal,
+    Optional,
+    OrderedDict,
+    Tuple,
+    Union,
+)
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.database import get_db
-from app.models import (
-    Group,
-    ScheduleGroup,
-    Student,
-    Teacher,
-    TermSchedule,
-)
+from app.cache import ScheduleResponseCache
+from app.database import get_db, get_read_db
+from app.models import Group, Student, Teacher
 from app.auth import get_current_active_student, get_current_active_teacher
-from app.schemas.schedule import DayLessonResponse, WeekLessonResponse
-from app.services.schedule import ScheduleService
+from app.redis import get_redis_binary_client, get_redis_client
+from app.schemas.core import Lang
+from app.schemas.schedule import (
+    CompactWeekResponse,
+    DayLessonResponse,
+    WeekLessonResponse,
+)
+from app.services.schedule import LESSON_FIELDS, ScheduleService, parse_lesson_fields
+from app.services.teacher_groups import teacher_group_index
+from app.utils.compression import choose_encoding, compress_variants
 from app.utils.date_utils import get_current_date, parse_date
 from app.utils.validate import validate_week_type
 
 teacher_router = APIRouter(prefix="/teacher/schedule", tags=["schedule"])
 student_router = APIRouter(prefix="/student/schedule", tags=["schedule"])
 
+WeekFormat = Literal["full", "compact"]
+WeekResponse = Union[OrderedDict[str, List[WeekLessonResponse]], CompactWeekResponse]
+WEEK_FORMAT_QUERY = Query(
+    "full",
+    description="`compact` returns lessons with ids and each entity once",
+)
+
+DayAdapter = TypeAdapter(List[DayLessonResponse])
+WeekAdapter = TypeAdapter(OrderedDict[str, List[WeekLessonResponse]])
+
+
+def lesson_fields(
+    fields: Optional[str] = Query(
+        None,
+        description=f"Comma-separated subset of {', '.join(LESSON_FIELDS)}",
+        example="lesson_period,subject,location",
+    ),
+) -> Optional[Tuple[str, ...]]:
+    try:
+        return parse_lesson_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def fields_key(fields: Optional[Tuple[str, ...]]) -> str:
+    return ",".join(fields) if fields else "all"
+
+
+async def render_week(
+    schedule_service: ScheduleService, schedules: list, format: WeekFormat
+) -> bytes:
+    if format == "compact":
+        body = schedule_service.build_compact_weekly_structure(schedules)
+        return body.model_dump_json(exclude_unset=True).encode()
+    return WeekAdapter.dump_json(
+        await schedule_service.build_weekly_structure(schedules), exclude_unset=True
+    )
+
+
+async def cached_schedule(
+    request: Request,
+    redis: Redis,
+    key: str,
+    build: Callable[[], Awaitable[bytes]],
+) -> Response:
+    """
+    Serve a schedule body from the precompressed cache, building, compressing
+    and storing every variant on a miss.
+
+    `key` must cover everything the body depends on besides the timetable
+    generation. Bodies are validated while mapping, so FastAPI's response
+    model pass is skipped. `build` must read the primary: a lagging replica
+    would store old rows under the new generation.
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    cache = ScheduleResponseCache(redis)
+    generation, body = await cache.lookup(key, encoding)
+    if body is None:
+        variants = await run_in_threadpool(compress_variants, await build())
+        await cache.store(key, generation, variants)
+        body = variants[encoding]
+
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @teacher_router.get("/day", response_model=List[DayLessonResponse])
 async def get_day_schedule(
+    request: Request,
     target_date: str = Query(
         ..., description="Date in YYYY-MM-DD format", example="2024-03-15"
     ),
     only_for_me: bool = False,  # TODO set to true in prod
     teacher: Teacher = Depends(get_current_active_teacher),
     db: AsyncSession = Depends(get_db),
+    redis_binary: Redis = Depends(get_redis_binary_client),
+    lang: Optional[Lang] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(lesson_fields),
 ):
     """
     Get daily schedule for a teacher with optional filtering for current user only
 
     - **target_date**: Date in YYYY-MM-DD format
     - **only_for_me**: Show only lessons assigned to current teacher
+    - **lang**: Names in this locale only, as plain strings, without descriptions
+    - **fields**: Only these lesson fields (plus `id`) are loaded and returned
     """
-    try:
-        parsed_date = parse_date(target_date)
-        schedule_service = ScheduleService(db)
+    parsed_date = parse_date(target_date)
+    schedule_service = ScheduleService(db, lang, fields)
+
+    async def build() -> bytes:
         term = await schedule_service.get_active_term(parsed_date)
 
         if not term:
@@ -49,13 +138,20 @@ async def get_day_schedule(
             term.id, parsed_date, teacher.id if only_for_me else None
         )
 
-        for i in schedules:
-            for j in i.schedule_groups:
-                print(j.group)
-
-        return [
+        lessons = [
             schedule_service.map_to_lesson_response(schedule) for schedule in schedules
         ]
+        return DayAdapter.dump_json(lessons, exclude_unset=True)
+
+    # Everyone shares the unfiltered schedule
+    scope = teacher.id if only_for_me else "all"
+    try:
+        return await cached_schedule(
+            request,
+            redis_binary,
+            f"teacher-day:{parsed_date}:{scope}:{lang}:{fields_key(fields)}",
+            build,
+        )
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -63,21 +159,28 @@ async def get_day_schedule(
 
 @student_router.get("/day", response_model=List[DayLessonResponse])
 async def get_student_day_schedule(
+    request: Request,
     target_date: str = Query(
         ..., description="Date in YYYY-MM-DD format", example="2024-03-15"
     ),
     student: Student = Depends(get_current_active_student),
     db: AsyncSession = Depends(get_db),
+    redis_binary: Redis = Depends(get_redis_binary_client),
+    lang: Optional[Lang] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(lesson_fields),
 ):
     """
     Get daily schedule for a teacher with optional filtering for current user only
 
     - **target_date**: Date in YYYY-MM-DD format
     - **only_for_me**: Show only lessons assigned to current teacher
+    - **lang**: Names in this locale only, as plain strings, without descriptions
+    - **fields**: Only these lesson fields (plus `id`) are loaded and returned
     """
-    try:
-        parsed_date = parse_date(target_date)
-        schedule_service = ScheduleService(db)
+    parsed_date = parse_date(target_date)
+    schedule_service = ScheduleService(db, lang, fields)
+
+    async def build() -> bytes:
         term = await schedule_service.get_active_term(parsed_date)
 
         if not term:
@@ -87,25 +190,37 @@ async def get_student_day_schedule(
             term.id, parsed_date, student.id
         )
 
-        for i in schedules:
-            for j in i.schedule_groups:
-                print(j.group)
-
-        return [
+        lessons = [
             schedule_service.map_to_lesson_response(schedule) for schedule in schedules
         ]
+        return DayAdapter.dump_json(lessons, exclude_unset=True)
+
+    # A student's schedule is their group's, so classmates share the entry
+    try:
+        return await cached_schedule(
+            request,
+            redis_binary,
+            f"student-day:{parsed_date}:{student.group_id}:{lang}:{fields_key(fields)}",
+            build,
+        )
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@teacher_router.get("/week", response_model=OrderedDict[str, List[WeekLessonResponse]])
+@teacher_router.get("/week", response_model=WeekResponse)
 async def get_teacher_weekly_schedule(
+    request: Request,
     week_type: str = Query(..., description="Week type (upper/bottom)"),
     group_ids: List[int] = Query([], description="Filter by group IDs"),
     teacher: Teacher = Depends(get_current_active_teacher),
     only_for_me: bool = False,  # TODO set to true in prod
+    format: WeekFormat = WEEK_FORMAT_QUERY,
     db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis_client),
+    redis_binary: Redis = Depends(get_redis_binary_client),
+    lang: Optional[Lang] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(lesson_fields),
 ):
     """
     Get weekly schedule for authenticated teacher
@@ -113,11 +228,15 @@ async def get_teacher_weekly_schedule(
     - Returns lessons for current active term
     - Filters by week type (upper/bottom)
     - Optionally filters by group IDs
+    - **format**: `compact` moves subjects, teachers, sites, groups and
+      periods into a shared `entities` section
+    - **lang**: Names in this locale only, as plain strings, without descriptions
+    - **fields**: Only these lesson fields (plus `id`) are loaded and returned
     """
-    try:
-        current_date = get_current_date()
-        schedule_service = ScheduleService(db)
+    current_date = get_current_date()
+    schedule_service = ScheduleService(db, lang, fields)
 
+    async def build() -> bytes:
         # Get active term
         term = await schedule_service.get_active_term(current_date)
 
@@ -127,26 +246,51 @@ async def get_teacher_weekly_schedule(
         # Validate week type
         validate_week_type(week_type)
 
+        wanted_group_ids = group_ids
+        if only_for_me and wanted_group_ids:
+            # Groups this teacher doesn't teach can never match
+            taught_group_ids = await teacher_group_index.get_group_ids(
+                db, redis, teacher.id, term.id
+            )
+            wanted_group_ids = [g for g in wanted_group_ids if g in taught_group_ids]
+            if not wanted_group_ids:
+                return await render_week(schedule_service, [], format)
+
         # Get filtered schedules
         schedules = await schedule_service.get_teacher_weekly_schedules(
             term_id=term.id,
             week_type=week_type,
             teacher_id=teacher.id if only_for_me else None,
-            group_ids=group_ids if group_ids else None,
+            group_ids=wanted_group_ids if wanted_group_ids else None,
         )
 
         # Build ordered weekly structure
-        return await schedule_service.build_weekly_structure(schedules)
+        return await render_week(schedule_service, schedules, format)
+
+    # The active term follows the current date
+    scope = teacher.id if only_for_me else "all"
+    groups = ",".join(map(str, sorted(set(group_ids))))
+    key = (
+        f"teacher-week:{current_date}:{week_type}:{format}:{scope}:{groups}:{lang}"
+        f":{fields_key(fields)}"
+    )
+    try:
+        return await cached_schedule(request, redis_binary, key, build)
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@student_router.get("/week", response_model=OrderedDict[str, List[WeekLessonResponse]])
+@student_router.get("/week", response_model=WeekResponse)
 async def get_student_weekly_schedule(
+    request: Request,
     week_type: str = Query(..., description="Week type (upper/bottom)"),
     student: Student = Depends(get_current_active_student),
+    format: WeekFormat = WEEK_FORMAT_QUERY,
     db: AsyncSession = Depends(get_db),
+    redis_binary: Redis = Depends(get_redis_binary_client),
+    lang: Optional[Lang] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(lesson_fields),
 ):
     """
     Get weekly schedule for authenticated teacher
@@ -154,11 +298,15 @@ async def get_student_weekly_schedule(
     - Returns lessons for current active term
     - Filters by week type (upper/bottom)
     - Optionally filters by group IDs
+    - **format**: `compact` moves subjects, teachers, sites, groups and
+      periods into a shared `entities` section
+    - **lang**: Names in this locale only, as plain strings, without descriptions
+    - **fields**: Only these lesson fields (plus `id`) are loaded and returned
     """
-    try:
-        current_date = get_current_date()
-        schedule_service = ScheduleService(db)
+    current_date = get_current_date()
+    schedule_service = ScheduleService(db, lang, fields)
 
+    async def build() -> bytes:
         # Get active term
         term = await schedule_service.get_active_term(current_date)
 
@@ -176,7 +324,14 @@ async def get_student_weekly_schedule(
         )
 
         # Build ordered weekly structure
-        return await schedule_service.build_weekly_structure(schedules)
+        return await render_week(schedule_service, schedules, format)
+
+    key = (
+        f"student-week:{current_date}:{week_type}:{format}:{student.group_id}:{lang}"
+        f":{fields_key(fields)}"
+    )
+    try:
+        return await cached_schedule(request, redis_binary, key, build)
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -185,27 +340,36 @@ async def get_student_weekly_schedule(
 @teacher_router.get("/groups", response_model=List[dict])
 async def get_teacher_groups(
     teacher: Teacher = Depends(get_current_active_teacher),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    primary_db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis_client),
+    lang: Lang = "ru",
 ):
     """
-    Returns a list of all groups where the authenticated teacher teaches.
-    It does so by joining term schedules and schedule_groups, then returns distinct groups.
+    Returns a list of all groups where the authenticated teacher teaches
+    in the current term, read from the precomputed teacher -> groups index.
+    Group names are in **lang**.
     """
-    # Query distinct group_ids from schedule_groups for term schedules taught by this teacher.
-    result = await db.execute(
-        select(ScheduleGroup.group_id)
-        .join(TermSchedule, ScheduleGroup.schedule_id == TermSchedule.id)
-        .where(TermSchedule.teacher_id == teacher.id)
-        .distinct()
+    term = await ScheduleService(db).get_active_term(get_current_date())
+    if not term:
+        return []
+
+    # The index is kept until the next timetable edit, so it's built from
+    # the primary; the session only connects when the index is rebuilt
+    group_ids = await teacher_group_index.get_group_ids(
+        primary_db, redis, teacher.id, term.id
     )
-    group_ids = result.scalars().all()
 
     if not group_ids:
         return []
 
-    # Now, fetch the Group records corresponding to these group_ids.
-    result = await db.execute(select(Group).where(Group.id.in_(group_ids)))
-    groups = result.scalars().all()
-
-    # Map each group to a simple dictionary (adjust fields as needed)
-    return [{"group_id": g.id, "group_name": g.group_name_ru} for g in groups]
+    # Only the id and the name in the requested locale
+    result = await db.execute(
+        select(Group.id, getattr(Group, f"group_name_{lang}")).where(
+            Group.id.in_(group_ids)
+        )
+    )
+    return [
+        {"group_id": group_id, "group_name": group_name}
+        for group_id, group_name in result.all()
+    ]
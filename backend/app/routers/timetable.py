@@ -0,0 +1,69 @@
+import csv
+
+from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.auth import get_current_active_administrator
+from app.cache import apply_invalidations
+from app.database import get_db, mark_read_your_writes
+from app.services.timetable_import import (
+    Lookups,
+    TimetableImporter,
+    TimetableImportError,
+    iter_rows,
+    parse_lessons,
+)
+
+router = APIRouter(
+    prefix="/timetable",
+    tags=["timetable"],
+    dependencies=[Depends(get_current_active_administrator)],
+)
+
+
+@router.post(
+    "/import",
+    summary="Import a registrar timetable export (CSV or XLSX)",
+)
+async def import_timetable(
+    response: Response,
+    file: UploadFile = File(...),
+    prune: bool = False,
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Diff the uploaded timetable against the stored one and apply only the
+    changes.
+
+    - **prune**: Delete stored lessons of the imported terms that are missing
+      from the file. Lessons with attendance are kept and counted in
+      `stale_with_attendance`
+    - **dry_run**: Report the changes without applying them
+    """
+    lookups = await Lookups.load(db)
+    try:
+        # Parsing is CPU bound, keep it off the event loop
+        lessons = await run_in_threadpool(
+            lambda: parse_lessons(iter_rows(file.file, file.filename or ""), lookups)
+        )
+    except TimetableImportError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    except ImportError:
+        raise HTTPException(
+            status_code=400, detail="XLSX import requires openpyxl; upload a CSV"
+        )
+    except (ValueError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    importer = TimetableImporter(db)
+    diff = await importer.diff(lessons)
+    if not dry_run:
+        await importer.apply(diff, prune)
+        await db.commit()
+        # Core statements bypass the ORM change tracking in app.cache
+        await apply_invalidations(set(), schedules=True)
+        mark_read_your_writes(response)
+
+    return {"dry_run": dry_run, **diff.summary(prune)}
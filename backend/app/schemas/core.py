@@ -1,11 +1,14 @@
 # app/schemas/core.py
 
-from typing import Optional
+from typing import Literal, Optional, Union
 from pydantic import BaseModel
 
 
 BaseID = int
 
+# Locale a client may ask for; without one, both are returned
+Lang = Literal["ru", "en"]
+
 
 class LocalizedNameField(BaseModel):
     ru: str
@@ -15,3 +18,7 @@ class LocalizedNameField(BaseModel):
 class LocalizedDescriptionField(BaseModel):
     en: Optional[str] = None
     ru: Optional[str] = None
+
+
+# Both locales, or a plain string in the requested one
+LocalizedName = Union[LocalizedNameField, str]
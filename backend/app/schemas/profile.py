@@ -1,27 +1,27 @@
 from typing import List, Optional
 from pydantic import BaseModel
 
-from app.schemas.core import BaseID, LocalizedDescriptionField, LocalizedNameField
+from app.schemas.core import BaseID, LocalizedDescriptionField, LocalizedName
 
 
 class ProfileBase(BaseModel):
     id: BaseID
-    first_name: LocalizedNameField
-    last_name: LocalizedNameField
-    patronymic: LocalizedNameField
+    first_name: LocalizedName
+    last_name: LocalizedName
+    patronymic: LocalizedName
     phone: Optional[str] = None
 
 
 class RoleResponse(BaseModel):
     id: BaseID
-    name: LocalizedNameField
-    description: LocalizedDescriptionField
+    name: LocalizedName
+    description: Optional[LocalizedDescriptionField] = None
 
 
 class GroupResponse(BaseModel):
     id: BaseID
-    name: LocalizedNameField
-    description: LocalizedDescriptionField
+    name: LocalizedName
+    description: Optional[LocalizedDescriptionField] = None
 
 
 class UserProfileResponse(BaseModel):
@@ -1,9 +1,9 @@
 # app/schemas/schedule.py
 
-from typing import List, Optional
+from typing import Dict, List, Optional, OrderedDict
 from pydantic import BaseModel
 
-from app.schemas.core import LocalizedDescriptionField, LocalizedNameField, BaseID
+from app.schemas.core import BaseID, LocalizedDescriptionField, LocalizedName
 from app.schemas.profile import GroupResponse
 
 
@@ -16,39 +16,39 @@ class LessonPeriodResponse(BaseModel):
 
 class WeekTypeResponse(BaseModel):
     id: BaseID
-    name: LocalizedNameField
+    name: LocalizedName
 
 
 class DayOfWeekResponse(BaseModel):
     id: BaseID
     day_number: int
-    name: LocalizedNameField
+    name: LocalizedName
 
 
 class SubjectResponse(BaseModel):
     id: BaseID
-    name: LocalizedNameField
-    description: LocalizedDescriptionField
+    name: LocalizedName
+    description: Optional[LocalizedDescriptionField] = None
 
 
 class TeacherResponse(BaseModel):
     id: BaseID
     user_id: int
-    first_name: LocalizedNameField
-    last_name: LocalizedNameField
-    patronymic: LocalizedNameField
+    first_name: LocalizedName
+    last_name: LocalizedName
+    patronymic: LocalizedName
     phone: Optional[str]
 
 
 class LessonTypeResponse(BaseModel):
     id: BaseID
-    name: LocalizedNameField
+    name: LocalizedName
 
 
 class SiteResponse(BaseModel):
     id: BaseID
-    name: LocalizedNameField
-    description: LocalizedDescriptionField
+    name: LocalizedName
+    description: Optional[LocalizedDescriptionField] = None
 
 
 class LocationResponse(BaseModel):
@@ -64,22 +64,59 @@ class ScheduleResponse(BaseModel):
 
 
 class DayLessonResponse(BaseModel):
+    """A lesson; with `fields`, only those are set and serialized"""
+
     id: BaseID
-    lesson_period: LessonPeriodResponse
-    subject: SubjectResponse
-    teacher: TeacherResponse
-    lesson_type: LessonTypeResponse
-    location: LocationResponse
-    schedule: ScheduleResponse
-    groups: List[GroupResponse]
+    lesson_period: Optional[LessonPeriodResponse] = None
+    subject: Optional[SubjectResponse] = None
+    teacher: Optional[TeacherResponse] = None
+    lesson_type: Optional[LessonTypeResponse] = None
+    location: Optional[LocationResponse] = None
+    schedule: Optional[ScheduleResponse] = None
+    groups: Optional[List[GroupResponse]] = None
 
 
 class WeekLessonResponse(BaseModel):
     id: BaseID
-    lesson_period: LessonPeriodResponse
-    subject: SubjectResponse
-    teacher: TeacherResponse
-    lesson_type: LessonTypeResponse
-    location: LocationResponse
-    schedule: ScheduleResponse
-    groups: List[GroupResponse]
+    lesson_period: Optional[LessonPeriodResponse] = None
+    subject: Optional[SubjectResponse] = None
+    teacher: Optional[TeacherResponse] = None
+    lesson_type: Optional[LessonTypeResponse] = None
+    location: Optional[LocationResponse] = None
+    schedule: Optional[ScheduleResponse] = None
+    groups: Optional[List[GroupResponse]] = None
+
+
+class CompactLessonResponse(BaseModel):
+    """A weekly lesson referring to CompactWeekEntities by id"""
+
+    id: BaseID
+    term_id: Optional[BaseID] = None
+    lesson_period_id: Optional[BaseID] = None
+    subject_id: Optional[BaseID] = None
+    teacher_id: Optional[BaseID] = None
+    lesson_type_id: Optional[BaseID] = None
+    site_id: Optional[BaseID] = None
+    room_number: Optional[str] = None
+    is_virtual: Optional[bool] = None
+    day_of_week_id: Optional[BaseID] = None
+    week_type_id: Optional[BaseID] = None
+    group_ids: Optional[List[BaseID]] = None
+
+
+class CompactWeekEntities(BaseModel):
+    """Every entity referenced by the week's lessons, once, keyed by id"""
+
+    lesson_periods: Dict[BaseID, LessonPeriodResponse] = {}
+    subjects: Dict[BaseID, SubjectResponse] = {}
+    teachers: Dict[BaseID, TeacherResponse] = {}
+    lesson_types: Dict[BaseID, LessonTypeResponse] = {}
+    sites: Dict[BaseID, SiteResponse] = {}
+    days_of_week: Dict[BaseID, DayOfWeekResponse] = {}
+    week_types: Dict[BaseID, WeekTypeResponse] = {}
+    groups: Dict[BaseID, GroupResponse] = {}
+
+
+class CompactWeekResponse(BaseModel):
+    days: OrderedDict[str, List[CompactLessonResponse]]
+    entities: CompactWeekEntities
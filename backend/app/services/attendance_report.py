@@ -0,0 +1,101 @@
+# app/services/attendance_report.py
+from dataclasses import dataclass
+from datetime import date
+from typing import AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Attendance, Student, TermSchedule
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class AttendanceFilters:
+    term_id: Optional[int] = None
+    group_id: Optional[int] = None  # the student's group
+    subject_id: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+
+def encode_cursor(lesson_date: date, attendance_id: int) -> str:
+    return f"{lesson_date.isoformat()}:{attendance_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        lesson_date, attendance_id = cursor.split(":")
+        return date.fromisoformat(lesson_date), int(attendance_id)
+    except ValueError:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+
+
+class AttendanceReport:
+    """
+    Attendance listing ordered by (lesson_date, id). Pages continue from
+    the last row seen instead of an OFFSET, so every page costs the same
+    index range scan however deep into the table it is.
+    """
+
+    def __init__(self, filters: AttendanceFilters, after: Optional[str] = None):
+        self.filters = filters
+        self.after = decode_cursor(after) if after else None
+
+    def query(self) -> Select:
+        stmt = (
+            select(
+                Attendance.id,
+                Attendance.lesson_date,
+                Attendance.scanned_at,
+                Attendance.schedule_id,
+                Attendance.student_id,
+                Student.group_id,
+                TermSchedule.subject_id,
+                TermSchedule.term_id,
+            )
+            .join(TermSchedule, TermSchedule.id == Attendance.schedule_id)
+            .join(Student, Student.id == Attendance.student_id)
+            .order_by(Attendance.lesson_date, Attendance.id)
+        )
+
+        filters = self.filters
+        if filters.term_id is not None:
+            stmt = stmt.where(TermSchedule.term_id == filters.term_id)
+        if filters.group_id is not None:
+            stmt = stmt.where(Student.group_id == filters.group_id)
+        if filters.subject_id is not None:
+            stmt = stmt.where(TermSchedule.subject_id == filters.subject_id)
+        if filters.date_from is not None:
+            stmt = stmt.where(Attendance.lesson_date >= filters.date_from)
+        if filters.date_to is not None:
+            stmt = stmt.where(Attendance.lesson_date <= filters.date_to)
+        if self.after is not None:
+            stmt = stmt.where(
+                tuple_(Attendance.lesson_date, Attendance.id) > tuple_(*self.after)
+            )
+        return stmt
+
+    async def page(self, db: AsyncSession, limit: int) -> Tuple[List, Optional[str]]:
+        """Up to `limit` rows and the cursor of the next page, if there is one"""
+        # One extra row tells whether another page exists
+        result = await db.execute(self.query().limit(limit + 1))
+        rows = result.all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].lesson_date, rows[-1].id)
+
+    async def stream(self, db: AsyncSession, batch_size: int) -> AsyncIterator:
+        """
+        All matching rows through a server-side cursor, `batch_size` at a
+        time, so memory stays flat regardless of table size.
+        """
+        result = await db.stream(
+            self.query().execution_options(yield_per=batch_size)
+        )
+        async for row in result:
+            yield row
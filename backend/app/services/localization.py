@@ -0,0 +1,55 @@
+# app/services/localization.py
+from typing import List, Optional
+
+from app.schemas.core import (
+    Lang,
+    LocalizedDescriptionField,
+    LocalizedName,
+    LocalizedNameField,
+)
+
+LANGS = ("ru", "en")
+
+
+class Localizer:
+    """
+    Maps `<prefix>_ru`/`<prefix>_en` column pairs for one requested language.
+
+    With a lang, names come back as plain strings and descriptions are
+    dropped, so only that locale's name columns have to be loaded; without
+    one, both locales are returned as before. Attributes are only read for
+    the locales in use, since the others may be deferred.
+    """
+
+    def __init__(self, lang: Optional[Lang] = None):
+        self.lang = lang
+
+    def columns(self, model, *prefixes: str) -> List:
+        """Column attributes backing `prefixes` in the locales in use"""
+        langs = (self.lang,) if self.lang else LANGS
+        return [
+            getattr(model, f"{prefix}_{lang}") for prefix in prefixes for lang in langs
+        ]
+
+    def load_only(self, loader, model, *columns, names=()):
+        """
+        Restrict an eager `loader` of `model` to `columns` plus the name
+        columns in use; without a lang, every column is loaded as before.
+        """
+        if self.lang and names:
+            loader = loader.load_only(*columns, *self.columns(model, *names))
+        return loader
+
+    def name(self, obj, prefix: str) -> LocalizedName:
+        if self.lang:
+            return getattr(obj, f"{prefix}_{self.lang}")
+        return LocalizedNameField(
+            ru=getattr(obj, f"{prefix}_ru"), en=getattr(obj, f"{prefix}_en")
+        )
+
+    def description(self, obj, prefix: str) -> Optional[LocalizedDescriptionField]:
+        if self.lang:
+            return None
+        return LocalizedDescriptionField(
+            ru=getattr(obj, f"{prefix}_ru"), en=getattr(obj, f"{prefix}_en")
+        )
@@ -1,21 +1,61 @@
 # app/services/profile.py
+from redis.asyncio import Redis
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from sqlalchemy.orm import joinedload, load_only
+from typing import List, Optional
 
-from app.models import Group, ProfileMixin, Role, ScheduleGroup, TermSchedule, User
-from app.schemas.core import LocalizedDescriptionField, LocalizedNameField
+from app.models import Administrator, Group, ProfileMixin, Role, Student, Teacher, User
+from app.schemas.core import Lang
 from app.schemas.profile import (
     GroupResponse,
     ProfileBase,
     RoleResponse,
     UserProfileResponse,
 )
+from app.services.localization import Localizer
+from app.services.schedule import ScheduleService
+from app.services.teacher_groups import teacher_group_index
+from app.utils.date_utils import get_current_date
 
 
 class ProfileService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, redis: Redis, lang: Optional[Lang] = None):
         self.db = db
+        self.redis = redis
+        self.localizer = Localizer(lang)
+
+    def _profile(self, loader, model, *columns):
+        return self.localizer.load_only(
+            loader,
+            model,
+            model.user_id,
+            model.phone,
+            *columns,
+            names=("first_name", "last_name", "patronymic"),
+        )
+
+    async def load_user(self, user_id: int) -> User:
+        """Load the user with role, profile and student group in a single query"""
+        result = await self.db.execute(
+            select(User)
+            .options(
+                self.localizer.load_only(
+                    joinedload(User.role), Role, names=("role_name",)
+                ),
+                self._profile(joinedload(User.teacher_profile), Teacher),
+                self.localizer.load_only(
+                    self._profile(
+                        joinedload(User.student_profile), Student, Student.group_id
+                    ).joinedload(Student.group),
+                    Group,
+                    names=("group_name",),
+                ),
+                self._profile(joinedload(User.administrator_profile), Administrator),
+            )
+            .where(User.id == user_id)
+        )
+        return result.scalar_one()
 
     async def get_user_profile(self, user: User) -> UserProfileResponse:
         """Main service method with proper return type"""
@@ -37,15 +77,9 @@ class ProfileService:
         profile = self._get_profile_entity(user)
         return ProfileBase(
             id=profile.id,
-            first_name=LocalizedNameField(
-                ru=profile.first_name_ru, en=profile.first_name_en
-            ),
-            last_name=LocalizedNameField(
-                ru=profile.last_name_ru, en=profile.last_name_en
-            ),
-            patronymic=LocalizedNameField(
-                ru=profile.patronymic_ru, en=profile.patronymic_en
-            ),
+            first_name=self.localizer.name(profile, "first_name"),
+            last_name=self.localizer.name(profile, "last_name"),
+            patronymic=self.localizer.name(profile, "patronymic"),
             phone=profile.phone,
         )
 
@@ -53,10 +87,8 @@ class ProfileService:
         """Returns typed role response"""
         return RoleResponse(
             id=role.id,
-            name=LocalizedNameField(ru=role.role_name_ru, en=role.role_name_en),
-            description=LocalizedDescriptionField(
-                ru=role.role_description_ru, en=role.role_description_en
-            ),
+            name=self.localizer.name(role, "role_name"),
+            description=self.localizer.description(role, "role_description"),
         )
 
     async def _get_user_groups(self, user: User) -> List[GroupResponse]:
@@ -65,10 +97,8 @@ class ProfileService:
         return [
             GroupResponse(
                 id=group.id,
-                name=LocalizedNameField(ru=group.group_name_ru, en=group.group_name_en),
-                description=LocalizedDescriptionField(
-                    ru=group.group_description_ru, en=group.group_description_en
-                ),
+                name=self.localizer.name(group, "group_name"),
+                description=self.localizer.description(group, "group_description"),
             )
             for group in groups
         ]
@@ -86,13 +116,23 @@ class ProfileService:
     async def _fetch_groups(self, user: User) -> List[Group]:
         """Database query with typed return"""
         if user.teacher_profile:
-            result = await self.db.execute(
-                select(Group)
-                .join(ScheduleGroup)
-                .join(TermSchedule)
-                .where(TermSchedule.teacher_id == user.teacher_profile.id)
-                .distinct()
+            # Only groups taught in the current term
+            term = await ScheduleService(self.db).get_active_term(get_current_date())
+            if not term:
+                return []
+
+            group_ids = await teacher_group_index.get_group_ids(
+                self.db, self.redis, user.teacher_profile.id, term.id
             )
+            if not group_ids:
+                return []
+
+            stmt = select(Group).where(Group.id.in_(group_ids)).order_by(Group.id)
+            if self.localizer.lang:
+                stmt = stmt.options(
+                    load_only(*self.localizer.columns(Group, "group_name"))
+                )
+            result = await self.db.execute(stmt)
             return list(result.scalars().all())
 
         if user.student_profile and user.student_profile.group:
@@ -1,16 +1,19 @@
 # app/services/schedule.py
 from datetime import date
-from typing import List, Optional, OrderedDict
+from collections import defaultdict
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, OrderedDict, Tuple
 
 from sqlalchemy import asc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 
 from app.models import (
     Group,
     LessonType,
     ScheduleGroup,
+    Site,
     Student,
     Subject,
     Teacher,
@@ -20,12 +23,13 @@ from app.models import (
     WeekType,
     LessonPeriod,
 )
-from app.schemas.core import LocalizedDescriptionField, LocalizedNameField
+from app.schemas.core import Lang
 from app.schemas.profile import GroupResponse
 from app.schemas.schedule import (
+    CompactLessonResponse,
+    CompactWeekEntities,
+    CompactWeekResponse,
     DayOfWeekResponse,
-    LocalizedDescriptionField,
-    LocalizedNameField,
     LessonPeriodResponse,
     DayLessonResponse,
     WeekLessonResponse,
@@ -37,6 +41,7 @@ from app.schemas.schedule import (
     TeacherResponse,
     WeekTypeResponse,
 )
+from app.services.localization import Localizer
 from app.utils.date_utils import time_to_iso
 from app.utils.validate import validate_term_start_date
 
@@ -51,9 +56,130 @@ WEEKDAY_ORDER = {
 }
 
 
+# Top-level lesson fields a client can select; `id` is always returned
+LESSON_FIELDS = (
+    "lesson_period",
+    "subject",
+    "teacher",
+    "lesson_type",
+    "location",
+    "schedule",
+    "groups",
+)
+
+
+def parse_lesson_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Comma-separated lesson fields, in LESSON_FIELDS order; None means all"""
+    if not value:
+        return None
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = requested.difference(LESSON_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown lesson fields: {sorted(unknown)}. Valid: {list(LESSON_FIELDS)}"
+        )
+    return tuple(field for field in LESSON_FIELDS if field in requested)
+
+
+def _memoized(key: Callable[[Any], Any] = lambda entity: entity.id):
+    """
+    Map each distinct source once per service instance, i.e. per request.
+    Lessons sharing a subject, teacher, group or site then reuse one
+    already validated response object instead of building their own.
+    """
+
+    def decorator(mapper):
+        @wraps(mapper)
+        def wrapper(self, source):
+            cache_key = (mapper.__name__, key(source))
+            try:
+                return self._mapped[cache_key]
+            except KeyError:
+                mapped = self._mapped[cache_key] = mapper(self, source)
+                return mapped
+
+        return wrapper
+
+    return decorator
+
+
 class ScheduleService:
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        lang: Optional[Lang] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ):
         self.db = db
+        self.localizer = Localizer(lang)
+        self.fields = fields or LESSON_FIELDS
+        # Response objects of related rows, see _memoized
+        self._mapped: Dict[Tuple[str, Any], Any] = {}
+
+    def _lesson_options(self) -> list:
+        """
+        Eager loads for mapping the requested lesson fields. With a lang,
+        related rows load only that locale's name columns and skip the
+        descriptions.
+
+        Period, day and week type are joined by every lesson query anyway,
+        so they are populated from that join. A sparse request joins its
+        few other to-one relations into the same query as well; the full
+        one keeps them in separate SELECT ... IN queries, which stay narrow
+        when many lessons share the same rows.
+        """
+        localized = self.localizer.load_only
+        fields = self.fields
+        to_one = selectinload if fields == LESSON_FIELDS else joinedload
+
+        options = [
+            contains_eager(TermSchedule.lesson_period),
+            localized(
+                contains_eager(TermSchedule.day_of_week),
+                DayOfWeek,
+                DayOfWeek.day_number,
+                DayOfWeek.name_en,  # weekly structures are keyed by it
+                names=("name",),
+            ),
+            localized(
+                contains_eager(TermSchedule.week_type), WeekType, names=("name",)
+            ),
+        ]
+        if "subject" in fields:
+            options.append(
+                localized(
+                    to_one(TermSchedule.subject), Subject, names=("subject_name",)
+                )
+            )
+        if "teacher" in fields:
+            options.append(
+                localized(
+                    to_one(TermSchedule.teacher),
+                    Teacher,
+                    Teacher.user_id,
+                    Teacher.phone,
+                    names=("first_name", "last_name", "patronymic"),
+                )
+            )
+        if "lesson_type" in fields:
+            options.append(
+                localized(to_one(TermSchedule.lesson_type), LessonType, names=("name",))
+            )
+        if "location" in fields:
+            options.append(
+                localized(to_one(TermSchedule.site), Site, names=("site_name",))
+            )
+        if "groups" in fields:
+            options.append(
+                localized(
+                    selectinload(TermSchedule.schedule_groups).selectinload(
+                        ScheduleGroup.group
+                    ),
+                    Group,
+                    names=("group_name",),
+                )
+            )
+        return options
 
     async def get_active_term(self, target_date: date) -> Optional[Term]:
         """Get active term for the given date"""
@@ -86,18 +212,7 @@ class ScheduleService:
             .join(TermSchedule.lesson_period)
             .join(TermSchedule.day_of_week)
             .join(TermSchedule.week_type)
-            .options(
-                selectinload(TermSchedule.subject),
-                selectinload(TermSchedule.lesson_period),
-                selectinload(TermSchedule.site),
-                selectinload(TermSchedule.day_of_week),
-                selectinload(TermSchedule.lesson_type),
-                selectinload(TermSchedule.week_type),
-                selectinload(TermSchedule.teacher),
-                selectinload(TermSchedule.schedule_groups).selectinload(
-                    ScheduleGroup.group
-                ),
-            )
+            .options(*self._lesson_options())
             .where(
                 TermSchedule.term_id == term_id,
                 DayOfWeek.name_en == weekday_name,  # TODO consider deleting
@@ -130,18 +245,10 @@ class ScheduleService:
             .join(TermSchedule.lesson_period)
             .join(TermSchedule.day_of_week)
             .join(TermSchedule.week_type)
-            .options(
-                selectinload(TermSchedule.subject),
-                selectinload(TermSchedule.lesson_period),
-                selectinload(TermSchedule.site),
-                selectinload(TermSchedule.day_of_week),
-                selectinload(TermSchedule.lesson_type),
-                selectinload(TermSchedule.week_type),
-                selectinload(TermSchedule.teacher),
-                selectinload(TermSchedule.schedule_groups)
-                .selectinload(ScheduleGroup.group)
-                .selectinload(Group.students),
-            )
+            # Only lessons of the student's own group
+            .join(ScheduleGroup, ScheduleGroup.schedule_id == TermSchedule.id)
+            .join(Student, Student.group_id == ScheduleGroup.group_id)
+            .options(*self._lesson_options())
             .where(
                 TermSchedule.term_id == term_id,
                 DayOfWeek.name_en == weekday_name,  # TODO consider deleting
@@ -169,19 +276,31 @@ class ScheduleService:
 
     def map_to_lesson_response(self, schedule: TermSchedule) -> DayLessonResponse:
         """Map ORM model to response schema with helper methods"""
-        return DayLessonResponse(
-            id=schedule.id,
-            lesson_period=self._map_lesson_period(schedule.lesson_period),
-            subject=self._map_subject(schedule.subject),
-            teacher=self._map_teacher(schedule.teacher),
-            lesson_type=self._map_lesson_type(schedule.lesson_type),
-            location=self._map_location(schedule),
-            schedule=self._map_schedule_info(schedule),
-            groups=[
+        return DayLessonResponse(**self._lesson_values(schedule))
+
+    def _lesson_values(self, schedule: TermSchedule) -> dict:
+        """Requested response fields of one lesson; the rest stay unset"""
+        fields = self.fields
+        values = {"id": schedule.id}
+        if "lesson_period" in fields:
+            values["lesson_period"] = self._map_lesson_period(schedule.lesson_period)
+        if "subject" in fields:
+            values["subject"] = self._map_subject(schedule.subject)
+        if "teacher" in fields:
+            values["teacher"] = self._map_teacher(schedule.teacher)
+        if "lesson_type" in fields:
+            values["lesson_type"] = self._map_lesson_type(schedule.lesson_type)
+        if "location" in fields:
+            values["location"] = self._map_location(schedule)
+        if "schedule" in fields:
+            values["schedule"] = self._map_schedule_info(schedule)
+        if "groups" in fields:
+            values["groups"] = [
                 self._map_group(sg.group) for sg in schedule.schedule_groups if sg.group
-            ],
-        )
+            ]
+        return values
 
+    @_memoized()
     def _map_lesson_period(self, period: LessonPeriod) -> LessonPeriodResponse:
         return LessonPeriodResponse(
             id=period.id,
@@ -190,80 +309,77 @@ class ScheduleService:
             end_time=time_to_iso(period.end_time),
         )
 
+    @_memoized()
     def _map_subject(self, subject: Subject) -> SubjectResponse:
         return SubjectResponse(
             id=subject.id,
-            name=LocalizedNameField(
-                en=subject.subject_name_en, ru=subject.subject_name_ru
-            ),
-            description=LocalizedDescriptionField(
-                en=subject.subject_description_en, ru=subject.subject_description_ru
-            ),
+            name=self.localizer.name(subject, "subject_name"),
+            description=self.localizer.description(subject, "subject_description"),
         )
 
+    @_memoized()
     def _map_teacher(self, teacher: Teacher) -> TeacherResponse:
         return TeacherResponse(
             id=teacher.id,
             user_id=teacher.user_id,
-            first_name=LocalizedNameField(
-                en=teacher.first_name_en, ru=teacher.first_name_ru
-            ),
-            last_name=LocalizedNameField(
-                en=teacher.last_name_en, ru=teacher.last_name_ru
-            ),
-            patronymic=LocalizedNameField(
-                en=teacher.patronymic_en, ru=teacher.patronymic_ru
-            ),
+            first_name=self.localizer.name(teacher, "first_name"),
+            last_name=self.localizer.name(teacher, "last_name"),
+            patronymic=self.localizer.name(teacher, "patronymic"),
             phone=teacher.phone,
         )
 
+    @_memoized()
     def _map_lesson_type(self, lesson_type: LessonType) -> LessonTypeResponse:
         return LessonTypeResponse(
             id=lesson_type.id,
-            name=LocalizedNameField(en=lesson_type.name_en, ru=lesson_type.name_ru),
+            name=self.localizer.name(lesson_type, "name"),
         )
 
+    @_memoized(lambda s: (s.site.id, s.room_number, s.is_virtual))
     def _map_location(self, schedule: TermSchedule) -> LocationResponse:
         return LocationResponse(
-            site=SiteResponse(
-                id=schedule.site.id,
-                name=LocalizedNameField(
-                    en=schedule.site.site_name_en, ru=schedule.site.site_name_ru
-                ),
-                description=LocalizedDescriptionField(
-                    en=schedule.site.site_description_en,
-                    ru=schedule.site.site_description_ru,
-                ),
-            ),
+            site=self._map_site(schedule.site),
             room_number=schedule.room_number,
             is_virtual=schedule.is_virtual,
         )
 
+    @_memoized()
+    def _map_site(self, site: Site) -> SiteResponse:
+        return SiteResponse(
+            id=site.id,
+            name=self.localizer.name(site, "site_name"),
+            description=self.localizer.description(site, "site_description"),
+        )
+
+    @_memoized(lambda s: (s.term_id, s.day_of_week.id, s.week_type.id))
     def _map_schedule_info(self, schedule: TermSchedule) -> ScheduleResponse:
         return ScheduleResponse(
-            term_id=schedule.term.id,
-            day_of_week=DayOfWeekResponse(
-                id=schedule.day_of_week.id,
-                day_number=schedule.day_of_week.day_number,
-                name=LocalizedNameField(
-                    en=schedule.day_of_week.name_en, ru=schedule.day_of_week.name_ru
-                ),
-            ),
-            week_type=WeekTypeResponse(
-                id=schedule.week_type.id,
-                name=LocalizedNameField(
-                    en=schedule.week_type.name_en, ru=schedule.week_type.name_ru
-                ),
-            ),
+            term_id=schedule.term_id,
+            day_of_week=self._map_day_of_week(schedule.day_of_week),
+            week_type=self._map_week_type(schedule.week_type),
+        )
+
+    @_memoized()
+    def _map_day_of_week(self, day: DayOfWeek) -> DayOfWeekResponse:
+        return DayOfWeekResponse(
+            id=day.id,
+            day_number=day.day_number,
+            name=self.localizer.name(day, "name"),
         )
 
+    @_memoized()
+    def _map_week_type(self, week_type: WeekType) -> WeekTypeResponse:
+        return WeekTypeResponse(
+            id=week_type.id,
+            name=self.localizer.name(week_type, "name"),
+        )
+
+    @_memoized()
     def _map_group(self, group: Group) -> GroupResponse:
         return GroupResponse(
             id=group.id,
-            name=LocalizedNameField(ru=group.group_name_ru, en=group.group_name_en),
-            description=LocalizedDescriptionField(
-                ru=group.group_description_ru, en=group.group_description_en
-            ),
+            name=self.localizer.name(group, "group_name"),
+            description=self.localizer.description(group, "group_description"),
         )
 
     async def get_teacher_weekly_schedules(
@@ -279,18 +395,7 @@ class ScheduleService:
             .join(TermSchedule.day_of_week)
             .join(TermSchedule.lesson_period)
             .join(TermSchedule.week_type)
-            .options(
-                selectinload(TermSchedule.subject),
-                selectinload(TermSchedule.lesson_period),
-                selectinload(TermSchedule.site),
-                selectinload(TermSchedule.day_of_week),
-                selectinload(TermSchedule.lesson_type),
-                selectinload(TermSchedule.week_type),
-                selectinload(TermSchedule.teacher),
-                selectinload(TermSchedule.schedule_groups).selectinload(
-                    ScheduleGroup.group
-                ),
-            )
+            .options(*self._lesson_options())
             .where(
                 TermSchedule.term_id == term_id,
                 TermSchedule.week_type.has(WeekType.name_en == week_type),
@@ -323,18 +428,10 @@ class ScheduleService:
             .join(TermSchedule.day_of_week)
             .join(TermSchedule.lesson_period)
             .join(TermSchedule.week_type)
-            .options(
-                selectinload(TermSchedule.subject),
-                selectinload(TermSchedule.lesson_period),
-                selectinload(TermSchedule.site),
-                selectinload(TermSchedule.day_of_week),
-                selectinload(TermSchedule.lesson_type),
-                selectinload(TermSchedule.week_type),
-                selectinload(TermSchedule.teacher),
-                selectinload(TermSchedule.schedule_groups)
-                .selectinload(ScheduleGroup.group)
-                .selectinload(Group.students),
-            )
+            # Only lessons of the student's own group
+            .join(ScheduleGroup, ScheduleGroup.schedule_id == TermSchedule.id)
+            .join(Student, Student.group_id == ScheduleGroup.group_id)
+            .options(*self._lesson_options())
             .where(
                 TermSchedule.term_id == term_id,
                 TermSchedule.week_type.has(WeekType.name_en == week_type),
@@ -364,15 +461,62 @@ class ScheduleService:
 
     def _map_weekly_lesson(self, schedule: TermSchedule) -> WeekLessonResponse:
         """Map schedule to weekly lesson response"""
-        return WeekLessonResponse(
-            id=schedule.id,
-            lesson_period=self._map_lesson_period(schedule.lesson_period),
-            subject=self._map_subject(schedule.subject),
-            teacher=self._map_teacher(schedule.teacher),
-            lesson_type=self._map_lesson_type(schedule.lesson_type),
-            location=self._map_location(schedule),
-            schedule=self._map_schedule_info(schedule),
-            groups=[
-                self._map_group(sg.group) for sg in schedule.schedule_groups if sg.group
-            ],
-        )
+        return WeekLessonResponse(**self._lesson_values(schedule))
+
+    def build_compact_weekly_structure(
+        self, schedules: List[TermSchedule]
+    ) -> CompactWeekResponse:
+        """
+        Weekly structure whose lessons carry ids only; each referenced
+        entity is mapped once into the `entities` section.
+        """
+        days = OrderedDict((day, []) for day in WEEKDAY_ORDER.keys())
+        # Only tables of requested fields are created, and so serialized
+        tables = defaultdict(dict)
+        fields = self.fields
+
+        def ref(table_name: str, entity, mapper) -> int:
+            table = tables[table_name]
+            if entity.id not in table:
+                table[entity.id] = mapper(entity)
+            return entity.id
+
+        for sched in schedules:
+            values = {"id": sched.id}
+            if "lesson_period" in fields:
+                values["lesson_period_id"] = ref(
+                    "lesson_periods", sched.lesson_period, self._map_lesson_period
+                )
+            if "subject" in fields:
+                values["subject_id"] = ref(
+                    "subjects", sched.subject, self._map_subject
+                )
+            if "teacher" in fields:
+                values["teacher_id"] = ref(
+                    "teachers", sched.teacher, self._map_teacher
+                )
+            if "lesson_type" in fields:
+                values["lesson_type_id"] = ref(
+                    "lesson_types", sched.lesson_type, self._map_lesson_type
+                )
+            if "location" in fields:
+                values["site_id"] = ref("sites", sched.site, self._map_site)
+                values["room_number"] = sched.room_number
+                values["is_virtual"] = sched.is_virtual
+            if "schedule" in fields:
+                values["term_id"] = sched.term_id
+                values["day_of_week_id"] = ref(
+                    "days_of_week", sched.day_of_week, self._map_day_of_week
+                )
+                values["week_type_id"] = ref(
+                    "week_types", sched.week_type, self._map_week_type
+                )
+            if "groups" in fields:
+                values["group_ids"] = [
+                    ref("groups", sg.group, self._map_group)
+                    for sg in sched.schedule_groups
+                    if sg.group
+                ]
+            days[sched.day_of_week.name_en].append(CompactLessonResponse(**values))
+
+        return CompactWeekResponse(days=days, entities=CompactWeekEntities(**tables))
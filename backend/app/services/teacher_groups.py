@@ -0,0 +1,69 @@
+# app/services/teacher_groups.py
+from typing import Dict, FrozenSet, Tuple
+
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import get_schedule_generation
+from app.models import ScheduleGroup, TermSchedule
+
+TermMapping = Dict[int, FrozenSet[int]]
+
+
+class TeacherGroupIndex:
+    """
+    In-memory (teacher_id, term_id) -> group ids mapping.
+
+    Each term is built with one DISTINCT query and kept until the schedule
+    generation in Redis changes, so every worker rebuilds lazily after a
+    timetable edit. While Redis is down every call rebuilds from the
+    database, since a cached mapping can't be known to be current.
+    """
+
+    def __init__(self):
+        self._terms: Dict[int, Tuple[str, TermMapping]] = {}
+
+    async def get_group_ids(
+        self, db: AsyncSession, redis: Redis, teacher_id: int, term_id: int
+    ) -> FrozenSet[int]:
+        mapping = await self.get_term_mapping(db, redis, term_id)
+        return mapping.get(teacher_id, frozenset())
+
+    async def get_term_mapping(
+        self, db: AsyncSession, redis: Redis, term_id: int
+    ) -> TermMapping:
+        generation = await get_schedule_generation(redis)
+        if generation is None:
+            return await self._build_term(db, term_id)
+
+        cached = self._terms.get(term_id)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        mapping = await self._build_term(db, term_id)
+        self._terms[term_id] = (generation, mapping)
+        return mapping
+
+    async def _build_term(self, db: AsyncSession, term_id: int) -> TermMapping:
+        result = await db.execute(
+            select(TermSchedule.teacher_id, ScheduleGroup.group_id)
+            .join(ScheduleGroup, ScheduleGroup.schedule_id == TermSchedule.id)
+            .where(TermSchedule.term_id == term_id)
+            .distinct()
+        )
+
+        groups_by_teacher: Dict[int, set] = {}
+        for teacher_id, group_id in result.all():
+            groups_by_teacher.setdefault(teacher_id, set()).add(group_id)
+
+        return {
+            teacher_id: frozenset(group_ids)
+            for teacher_id, group_ids in groups_by_teacher.items()
+        }
+
+    def clear(self) -> None:
+        self._terms.clear()
+
+
+teacher_group_index = TeacherGroupIndex()
@@ -0,0 +1,534 @@
+# app/services/timetable_import.py
+import csv
+import io
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    Attendance,
+    DayOfWeek,
+    Group,
+    LessonPeriod,
+    LessonType,
+    ScheduleGroup,
+    Site,
+    Subject,
+    Teacher,
+    Term,
+    TermSchedule,
+    User,
+    WeekType,
+)
+
+# Columns of the registrar export; "groups" is a ";"-separated list.
+# "room" and "is_virtual" are optional.
+REQUIRED_COLUMNS = (
+    "term",
+    "week_type",
+    "day",
+    "lesson_number",
+    "subject",
+    "teacher_email",
+    "lesson_type",
+    "site",
+    "groups",
+)
+
+# (term_id, week_type_id, day_of_week_id, lesson_period_id)
+SlotKey = Tuple[int, int, int, int]
+KEY_FIELDS = (
+    "term_id",
+    "week_type_id",
+    "day_of_week_id",
+    "lesson_period_id",
+)
+PAYLOAD_FIELDS = (
+    "teacher_id",
+    "subject_id",
+    "lesson_type_id",
+    "site_id",
+    "room_number",
+    "is_virtual",
+)
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 50
+_TRUE_VALUES = {"1", "true", "yes", "y", "да"}
+
+
+class TimetableImportError(ValueError):
+    def __init__(self, errors: List[str]):
+        super().__init__(f"{len(errors)} invalid timetable rows")
+        self.errors = errors
+
+
+def _normalize(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # spreadsheet cells hold numbers as floats
+    return str(value if value is not None else "").strip().casefold()
+
+
+# ------------------- Reading -------------------
+
+
+def iter_csv(stream: IO[bytes]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    reader.fieldnames = [_normalize(name) for name in reader.fieldnames or []]
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_xlsx(stream: IO[bytes]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    # Optional dependency, only needed for XLSX exports
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_normalize(name) for name in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            if any(value is not None for value in values):
+                yield line, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(
+    stream: IO[bytes], filename: str
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(line number, row) pairs, read one row at a time"""
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".csv":
+        return iter_csv(stream)
+    if suffix == ".xlsx":
+        return iter_xlsx(stream)
+    raise ValueError(f"Unsupported timetable format: {suffix or filename}")
+
+
+# ------------------- Parsing -------------------
+
+
+@dataclass
+class ImportedLesson:
+    line: int
+    slot: SlotKey
+    payload: Dict[str, Any]
+    group_ids: FrozenSet[int]
+
+    def row(self) -> Dict[str, Any]:
+        return {**dict(zip(KEY_FIELDS, self.slot)), **self.payload}
+
+
+@dataclass
+class Lookups:
+    """Name -> id maps, built once per import. Names match in either locale."""
+
+    terms: Dict[str, int]
+    week_types: Dict[str, int]
+    days: Dict[str, int]
+    periods: Dict[str, int]
+    subjects: Dict[str, int]
+    lesson_types: Dict[str, int]
+    sites: Dict[str, int]
+    groups: Dict[str, int]
+    teachers: Dict[str, int]
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> "Lookups":
+        async def by_names(*columns) -> Dict[str, int]:
+            mapping = {}
+            for row in (await db.execute(select(*columns))).all():
+                for name in row[1:]:
+                    if name is not None:
+                        mapping[_normalize(name)] = row[0]
+            return mapping
+
+        return cls(
+            terms=await by_names(Term.id, Term.term_name_en, Term.term_name_ru),
+            week_types=await by_names(
+                WeekType.id, WeekType.name_en, WeekType.name_ru
+            ),
+            days=await by_names(
+                DayOfWeek.id,
+                DayOfWeek.name_en,
+                DayOfWeek.name_ru,
+                DayOfWeek.day_number,
+            ),
+            periods=await by_names(LessonPeriod.id, LessonPeriod.lesson_number),
+            subjects=await by_names(
+                Subject.id, Subject.subject_name_en, Subject.subject_name_ru
+            ),
+            lesson_types=await by_names(
+                LessonType.id, LessonType.name_en, LessonType.name_ru
+            ),
+            sites=await by_names(Site.id, Site.site_name_en, Site.site_name_ru),
+            groups=await by_names(
+                Group.id, Group.group_name_en, Group.group_name_ru
+            ),
+            # Teacher names aren't unique, their login emails are
+            teachers={
+                _normalize(email): teacher_id
+                for teacher_id, email in (
+                    await db.execute(
+                        select(Teacher.id, User.email).join(Teacher.user)
+                    )
+                ).all()
+            },
+        )
+
+
+def parse_lessons(
+    rows: Iterable[Tuple[int, Dict[str, Any]]], lookups: Lookups
+) -> Dict[SlotKey, List[ImportedLesson]]:
+    """
+    Resolve every row to ids and group the lessons by slot. Rows sharing a
+    slot, teacher and payload are merged (one row per group is a common
+    export layout); rows that disagree, and lessons that put a group in two
+    places at once, are reported. Raises TimetableImportError listing the
+    bad rows.
+    """
+    merged: Dict[Tuple[SlotKey, int], ImportedLesson] = {}
+    errors: List[str] = []
+
+    def resolve(
+        line: int, row: Dict[str, Any], column: str, mapping: Dict[str, int]
+    ) -> Optional[int]:
+        value = row.get(column)
+        resolved = mapping.get(_normalize(value))
+        if resolved is None:
+            errors.append(f"line {line}: unknown {column} {value!r}")
+        return resolved
+
+    for line, row in rows:
+        missing = [
+            column for column in REQUIRED_COLUMNS if row.get(column) in (None, "")
+        ]
+        if missing:
+            errors.append(f"line {line}: missing {', '.join(missing)}")
+            continue
+
+        error_count = len(errors)
+        slot = (
+            resolve(line, row, "term", lookups.terms),
+            resolve(line, row, "week_type", lookups.week_types),
+            resolve(line, row, "day", lookups.days),
+            resolve(line, row, "lesson_number", lookups.periods),
+        )
+        payload = {
+            "teacher_id": resolve(line, row, "teacher_email", lookups.teachers),
+            "subject_id": resolve(line, row, "subject", lookups.subjects),
+            "lesson_type_id": resolve(
+                line, row, "lesson_type", lookups.lesson_types
+            ),
+            "site_id": resolve(line, row, "site", lookups.sites),
+            "room_number": str(row.get("room") or "").strip() or None,
+            "is_virtual": _normalize(row.get("is_virtual")) in _TRUE_VALUES,
+        }
+        group_ids = frozenset(
+            resolve(line, {"groups": name}, "groups", lookups.groups)
+            for name in str(row["groups"]).split(";")
+            if name.strip()
+        )
+        if len(errors) > error_count:
+            continue
+
+        merge_key = (slot, payload["teacher_id"])
+        existing = merged.get(merge_key)
+        if existing is None:
+            merged[merge_key] = ImportedLesson(line, slot, payload, group_ids)
+        elif existing.payload == payload:
+            existing.group_ids = existing.group_ids | group_ids
+        else:
+            errors.append(
+                f"line {line}: conflicts with line {existing.line} "
+                "(same term, week, day, period and teacher)"
+            )
+
+    lessons: Dict[SlotKey, List[ImportedLesson]] = {}
+    for lesson in merged.values():
+        slot_lessons = lessons.setdefault(lesson.slot, [])
+        existing = next(
+            (other for other in slot_lessons if other.group_ids & lesson.group_ids),
+            None,
+        )
+        if existing is None:
+            slot_lessons.append(lesson)
+        else:
+            errors.append(
+                f"line {lesson.line}: conflicts with line {existing.line} "
+                "(same term, week, day, period and a shared group)"
+            )
+
+    if errors:
+        raise TimetableImportError(errors[:MAX_REPORTED_ERRORS])
+    return lessons
+
+
+# ------------------- Diff and apply -------------------
+
+
+@dataclass
+class TimetableDiff:
+    inserts: List[ImportedLesson] = field(default_factory=list)
+    # (schedule id, lesson)
+    updates: List[Tuple[int, ImportedLesson]] = field(default_factory=list)
+    # (schedule id, group id)
+    group_inserts: List[Tuple[int, int]] = field(default_factory=list)
+    group_deletes: List[Tuple[int, int]] = field(default_factory=list)
+    # Existing lessons missing from the file; only deleted when pruning
+    stale: List[int] = field(default_factory=list)
+    # Stale lessons with recorded attendance, which are never deleted
+    attended: Set[int] = field(default_factory=set)
+    unchanged: int = 0
+
+    def prunable(self) -> List[int]:
+        return [
+            schedule_id
+            for schedule_id in self.stale
+            if schedule_id not in self.attended
+        ]
+
+    def removed_groups(self, prune: bool) -> List[Tuple[int, int]]:
+        """Group removals, less those of lessons deleted by pruning"""
+        pruned = set(self.prunable()) if prune else set()
+        return [
+            (schedule_id, group_id)
+            for schedule_id, group_id in self.group_deletes
+            if schedule_id not in pruned
+        ]
+
+    def summary(self, prune: bool) -> Dict[str, int]:
+        deleted = len(self.prunable()) if prune else 0
+        return {
+            "inserted": len(self.inserts),
+            "updated": len(self.updates),
+            "groups_added": len(self.group_inserts),
+            "groups_removed": len(self.removed_groups(prune)),
+            "deleted": deleted,
+            "stale": len(self.stale) - deleted,
+            "stale_with_attendance": len(self.attended),
+            "unchanged": self.unchanged,
+        }
+
+
+def _batches(items: List[Any], size: int = BATCH_SIZE) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _match_slot(
+    lessons: List[ImportedLesson], rows: List[Any], groups: Dict[int, Set[int]]
+) -> List[Tuple[Optional[Any], Optional[ImportedLesson]]]:
+    """
+    Pair the file's lessons in one slot with the stored ones: first by
+    teacher, then by shared groups, preferring the most shared groups.
+    Unpaired rows and lessons come back paired with None.
+    """
+
+    def shared(lesson: ImportedLesson, row: Any) -> int:
+        return len(lesson.group_ids & groups.get(row.id, set()))
+
+    def candidate(lesson: ImportedLesson, row: Any, by_teacher: bool) -> bool:
+        if by_teacher:
+            return row.teacher_id == lesson.payload["teacher_id"]
+        return shared(lesson, row) > 0
+
+    rows = list(rows)
+    pairs: List[Tuple[Optional[Any], Optional[ImportedLesson]]] = []
+    for by_teacher in (True, False):
+        unpaired = []
+        for lesson in lessons:
+            candidates = [row for row in rows if candidate(lesson, row, by_teacher)]
+            if not candidates:
+                unpaired.append(lesson)
+                continue
+            row = max(candidates, key=lambda row: shared(lesson, row))
+            rows.remove(row)
+            pairs.append((row, lesson))
+        lessons = unpaired
+
+    pairs.extend((row, None) for row in rows)
+    pairs.extend((None, lesson) for lesson in lessons)
+    return pairs
+
+
+class TimetableImporter:
+    """
+    Applies a registrar timetable as a diff against the stored one.
+
+    Lessons are matched within their slot (term, week type, day, lesson
+    period) by teacher or by shared groups, and updated in place, groups
+    included, so a re-import only touches what actually changed and keeps
+    the attendance of changed lessons. Pruning skips lessons that have
+    attendance, so history is never lost.
+    All statements are Core executemany batches; the caller commits.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def diff(
+        self, lessons: Dict[SlotKey, List[ImportedLesson]]
+    ) -> TimetableDiff:
+        term_ids = {slot[0] for slot in lessons}
+        table = TermSchedule.__table__
+        existing_rows = (
+            await self.db.execute(
+                select(
+                    table.c.id,
+                    *(table.c[name] for name in KEY_FIELDS + PAYLOAD_FIELDS),
+                )
+                .where(table.c.term_id.in_(term_ids))
+                .order_by(table.c.id)
+            )
+        ).all()
+
+        groups_by_schedule: Dict[int, set] = {}
+        for batch in _batches([row.id for row in existing_rows]):
+            result = await self.db.execute(
+                select(ScheduleGroup.schedule_id, ScheduleGroup.group_id).where(
+                    ScheduleGroup.schedule_id.in_(batch)
+                )
+            )
+            for schedule_id, group_id in result.all():
+                groups_by_schedule.setdefault(schedule_id, set()).add(group_id)
+
+        rows_by_slot: Dict[SlotKey, List[Any]] = {}
+        for row in existing_rows:
+            slot = tuple(getattr(row, name) for name in KEY_FIELDS)
+            rows_by_slot.setdefault(slot, []).append(row)
+
+        diff = TimetableDiff()
+        for slot, slot_lessons in lessons.items():
+            # A stale lesson keeps none of the groups the file now places
+            # elsewhere in its slot, so no group sees the slot twice
+            taken = set().union(*(lesson.group_ids for lesson in slot_lessons))
+            pairs = _match_slot(
+                slot_lessons, rows_by_slot.pop(slot, []), groups_by_schedule
+            )
+            for row, lesson in pairs:
+                if row is None:
+                    diff.inserts.append(lesson)
+                    continue
+
+                current_groups = groups_by_schedule.get(row.id, set())
+                if lesson is None:
+                    diff.stale.append(row.id)
+                    diff.group_deletes.extend(
+                        (row.id, group_id) for group_id in current_groups & taken
+                    )
+                    continue
+
+                changed = any(
+                    getattr(row, name) != lesson.payload[name]
+                    for name in PAYLOAD_FIELDS
+                )
+                if changed:
+                    diff.updates.append((row.id, lesson))
+                added = lesson.group_ids - current_groups
+                removed = current_groups - lesson.group_ids
+                diff.group_inserts.extend((row.id, group_id) for group_id in added)
+                diff.group_deletes.extend((row.id, group_id) for group_id in removed)
+                if not (changed or added or removed):
+                    diff.unchanged += 1
+
+        # Slots missing from the file entirely
+        for rows in rows_by_slot.values():
+            diff.stale.extend(row.id for row in rows)
+
+        for batch in _batches(diff.stale):
+            result = await self.db.execute(
+                select(Attendance.schedule_id)
+                .where(Attendance.schedule_id.in_(batch))
+                .distinct()
+            )
+            diff.attended.update(result.scalars().all())
+        return diff
+
+    async def apply(self, diff: TimetableDiff, prune: bool = False) -> None:
+        table = TermSchedule.__table__
+        groups_table = ScheduleGroup.__table__
+
+        if prune:
+            # Only lessons without attendance, which would go with them
+            # (ON DELETE CASCADE)
+            for batch in _batches(diff.prunable()):
+                await self.db.execute(delete(table).where(table.c.id.in_(batch)))
+
+        if diff.updates:
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values({name: bindparam(f"b_{name}") for name in PAYLOAD_FIELDS})
+            )
+            for batch in _batches(diff.updates):
+                await self.db.execute(
+                    stmt,
+                    [
+                        {
+                            "b_id": schedule_id,
+                            **{f"b_{k}": v for k, v in lesson.payload.items()},
+                        }
+                        for schedule_id, lesson in batch
+                    ],
+                )
+
+        group_deletes = diff.removed_groups(prune)
+        if group_deletes:
+            stmt = delete(groups_table).where(
+                groups_table.c.schedule_id == bindparam("b_schedule_id"),
+                groups_table.c.group_id == bindparam("b_group_id"),
+            )
+            for batch in _batches(group_deletes):
+                await self.db.execute(
+                    stmt,
+                    [
+                        {"b_schedule_id": schedule_id, "b_group_id": group_id}
+                        for schedule_id, group_id in batch
+                    ],
+                )
+
+        group_rows = [
+            {"schedule_id": schedule_id, "group_id": group_id}
+            for schedule_id, group_id in diff.group_inserts
+        ]
+        stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        for batch in _batches(diff.inserts):
+            result = await self.db.execute(stmt, [lesson.row() for lesson in batch])
+            for schedule_id, lesson in zip(result.scalars().all(), batch):
+                group_rows.extend(
+                    {"schedule_id": schedule_id, "group_id": group_id}
+                    for group_id in lesson.group_ids
+                )
+
+        for batch in _batches(group_rows):
+            await self.db.execute(insert(groups_table), batch)
+
+    async def run(
+        self,
+        rows: Iterable[Tuple[int, Dict[str, Any]]],
+        prune: bool = False,
+        dry_run: bool = False,
+        lookups: Optional[Lookups] = None,
+    ) -> Dict[str, int]:
+        lookups = lookups or await Lookups.load(self.db)
+        diff = await self.diff(parse_lessons(rows, lookups))
+        if not dry_run:
+            await self.apply(diff, prune)
+        return diff.summary(prune)
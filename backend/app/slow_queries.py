@@ -0,0 +1,119 @@
+# app/slow_queries.py
+import asyncio
+import json
+import logging
+import random
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_EXPLAINABLE = ("SELECT", "WITH")
+
+
+@dataclass
+class SlowQuery:
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: Any
+    plan: Optional[Any] = None
+    explain_error: Optional[str] = None
+
+
+def redact(parameters: Any) -> Any:
+    """Keep the shape and types of bound parameters, never their values"""
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    if parameters is None:
+        return None
+    return f"<{type(parameters).__name__}>"
+
+
+class SlowQueryLog:
+    """
+    Ring buffer of statements slower than the configured threshold.
+
+    A sampled share of slow SELECTs is re-planned with EXPLAIN on a separate
+    connection in the background, so the request that was slow isn't held
+    up any further.
+    """
+
+    def __init__(self, threshold_ms: float, explain_sample_rate: float, size: int):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self._entries: deque = deque(maxlen=size)
+        self._explain_tasks: Set[asyncio.Task] = set()
+
+    def record(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        elapsed: float,
+        executemany: bool = False,
+    ) -> None:
+        duration_ms = elapsed * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        entry = SlowQuery(
+            recorded_at=datetime.now(timezone.utc),
+            duration_ms=round(duration_ms, 2),
+            statement=statement,
+            parameters=redact(parameters),
+        )
+        self._entries.append(entry)
+        logger.warning("Slow query (%.1f ms): %s", duration_ms, statement)
+
+        if (
+            not executemany
+            and engine.dialect.name == "postgresql"
+            and statement.lstrip().upper().startswith(_EXPLAINABLE)
+            and random.random() < self.explain_sample_rate
+        ):
+            self._schedule_explain(engine, entry, parameters)
+
+    def _schedule_explain(
+        self, engine: AsyncEngine, entry: SlowQuery, parameters: Any
+    ) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._explain(engine, entry, parameters))
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(
+        self, engine: AsyncEngine, entry: SlowQuery, parameters: Any
+    ) -> None:
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE off, FORMAT JSON) {entry.statement}",
+                    parameters,
+                )
+                plan = result.scalar_one()
+            entry.plan = json.loads(plan) if isinstance(plan, str) else plan
+        except Exception as e:
+            entry.explain_error = str(e)
+
+    def entries(self) -> List[dict]:
+        """Newest first"""
+        return [asdict(entry) for entry in reversed(self._entries)]
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.slow_query_threshold_ms,
+    explain_sample_rate=settings.slow_query_explain_sample_rate,
+    size=settings.slow_query_log_size,
+)
@@ -0,0 +1,44 @@
+# app/utils/compression.py
+import gzip
+from typing import Dict, Optional
+
+import brotli
+
+from app.config import settings
+
+# Preferred first; "identity" is always acceptable
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """Best supported content coding allowed by an Accept-Encoding header"""
+    if not accept_encoding:
+        return "identity"
+
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    for coding in SUPPORTED_ENCODINGS:
+        if qualities.get(coding, qualities.get("*", 0.0)) > 0:
+            return coding
+    return "identity"
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """The body in every supported coding, keyed like Content-Encoding"""
+    return {
+        "identity": body,
+        "gzip": gzip.compress(
+            body, compresslevel=settings.schedule_cache_gzip_level, mtime=0
+        ),
+        "br": brotli.compress(body, quality=settings.schedule_cache_brotli_quality),
+    }
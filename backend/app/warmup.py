@@ -0,0 +1,130 @@
+# app/warmup.py
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import configure_mappers
+
+from app.config import settings
+from app.database import async_session, engine, replica_engine
+from app.models import DayOfWeek, LessonPeriod, LessonType, WeekType
+from app.redis import redis_client
+from app.services.schedule import ScheduleService
+from app.services.teacher_groups import teacher_group_index
+from app.utils.date_utils import get_current_date
+
+logger = logging.getLogger(__name__)
+
+
+async def _configure_mappers() -> None:
+    configure_mappers()
+
+
+async def _prime_pool(pool_engine: AsyncEngine) -> None:
+    """Open the pool's base connections at once so none are made on demand"""
+    async with AsyncExitStack() as stack:
+        connections = await asyncio.gather(
+            *(
+                stack.enter_async_context(pool_engine.connect())
+                for _ in range(settings.db_pool_size)
+            )
+        )
+        for conn in connections:
+            await conn.execute(text("SELECT 1"))
+
+
+async def _prime_pools() -> None:
+    await _prime_pool(engine)
+    if replica_engine is not engine:
+        await _prime_pool(replica_engine)
+
+
+async def _ping_redis() -> None:
+    await redis_client.ping()
+
+
+async def _warm_schedule_queries() -> None:
+    """
+    Run the schedule statements once so SQLAlchemy's compiled cache and the
+    asyncpg statement cache are filled before real traffic arrives, and
+    build the active term's teacher -> groups index. Both run on the
+    primary, which serves the schedule caches' misses.
+    """
+    async with async_session() as db:
+        schedule_service = ScheduleService(db)
+        today = get_current_date()
+        term = await schedule_service.get_active_term(today)
+        term_id = term.id if term else 0
+
+        await schedule_service.get_teacher_weekly_schedules(term_id, "upper")
+        await schedule_service.get_student_weekly_schedules(term_id, "upper", 0)
+        if term is None:
+            return
+
+        await schedule_service.get_teacher_daily_schedules(term.id, today)
+        await schedule_service.get_student_daily_schedules(term.id, today, 0)
+        await teacher_group_index.get_term_mapping(db, redis_client, term.id)
+
+
+async def _load_reference_data() -> None:
+    """
+    Read the small lookup tables every schedule response embeds, so their
+    pages are in the database's buffer cache before the first request.
+    """
+    async with async_session() as db:
+        for model in (LessonPeriod, DayOfWeek, WeekType, LessonType):
+            await db.scalars(select(model))
+
+
+class Warmup:
+    """
+    Startup work that would otherwise land on the first requests.
+
+    The worker reports ready once every required step has succeeded;
+    optional steps only make the first requests faster.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, str] = {}
+        # (name, step, required)
+        self._steps: List[Tuple[str, Callable[[], Awaitable[None]], bool]] = [
+            ("mappers", _configure_mappers, True),
+            ("db_pool", _prime_pools, True),
+            ("redis", _ping_redis, True),
+            ("reference_data", _load_reference_data, False),
+            ("schedule_queries", _warm_schedule_queries, False),
+        ]
+
+    async def run(self) -> bool:
+        for name, step, required in self._steps:
+            if self.steps.get(name, "").startswith("ok"):
+                continue
+            if not required and name in self.steps:
+                continue  # optional steps are attempted once
+            started_at = time.perf_counter()
+            try:
+                await asyncio.wait_for(
+                    step(), timeout=settings.warmup_step_timeout_seconds
+                )
+            except Exception as e:
+                self.steps[name] = f"failed: {e!r}"
+                logger.warning("Warmup step %s failed", name, exc_info=True)
+            else:
+                elapsed_ms = (time.perf_counter() - started_at) * 1000
+                self.steps[name] = f"ok ({elapsed_ms:.0f} ms)"
+
+        self.ready = all(
+            self.steps[name].startswith("ok")
+            for name, _, required in self._steps
+            if required
+        )
+        return self.ready
+
+    async def run_until_ready(self) -> None:
+        while not await self.run():
+            await asyncio.sleep(settings.warmup_retry_interval_seconds)
@@ -0,0 +1,510 @@
+"""
+Microbenchmark for schedule response mapping and JSON serialization.
+
+Builds a synthetic in-memory TermSchedule graph (no database) and times
+ScheduleService mapping plus serialization per lesson and per full weekly
+structure, next to model_construct and plain dict equivalents. Week cases
+also print the size of the JSON body; week/unmemoized shows what the
+service's per-request mapping cache saves on a full week.
+
+Baselines are machine specific and kept out of git. Record one, then check
+against it after a change:
+
+    python -m scripts.bench_schedule_mapping --save-baseline
+    python -m scripts.bench_schedule_mapping --check [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import OrderedDict
+from datetime import time as dt_time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from pydantic import TypeAdapter
+
+from app.models import (
+    DayOfWeek,
+    Group,
+    LessonPeriod,
+    LessonType,
+    ScheduleGroup,
+    Site,
+    Subject,
+    Teacher,
+    Term,
+    TermSchedule,
+    WeekType,
+)
+from app.schemas.core import LocalizedDescriptionField, LocalizedNameField
+from app.schemas.profile import GroupResponse
+from app.schemas.schedule import (
+    DayLessonResponse,
+    DayOfWeekResponse,
+    LessonPeriodResponse,
+    LessonTypeResponse,
+    LocationResponse,
+    ScheduleResponse,
+    SiteResponse,
+    SubjectResponse,
+    TeacherResponse,
+    WeekLessonResponse,
+    WeekTypeResponse,
+)
+from app.services.schedule import WEEKDAY_ORDER, ScheduleService
+from app.utils.date_utils import time_to_iso
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent.parent / ".benchmarks"
+DEFAULT_BASELINE = BENCHMARKS_DIR / "schedule_mapping.json"
+
+WeekAdapter = TypeAdapter(Dict[str, List[WeekLessonResponse]])
+
+
+# ------------------- Synthetic data -------------------
+
+
+def build_schedules(
+    lessons: int, groups_per_lesson: int, seed: int = 0
+) -> List[TermSchedule]:
+    """
+    Detached ORM graph shaped like a busy week: related rows are shared
+    between lessons the way they are in a real timetable.
+    """
+    rng = random.Random(seed)
+
+    term = Term(id=1, term_name_en="Term", term_name_ru="Семестр")
+    week_type = WeekType(id=1, name_en="upper", name_ru="Верхняя")
+    days = [
+        DayOfWeek(id=index + 1, day_number=index + 1, name_en=name, name_ru=name)
+        for name, index in WEEKDAY_ORDER.items()
+    ]
+    periods = [
+        LessonPeriod(
+            id=i,
+            lesson_number=i,
+            start_time=dt_time(8 + i, 0),
+            end_time=dt_time(9 + i, 35),
+        )
+        for i in range(1, 8)
+    ]
+    subjects = [
+        Subject(
+            id=i,
+            subject_name_en=f"Subject {i}",
+            subject_name_ru=f"Предмет {i}",
+            subject_description_en=f"Description of subject {i}",
+            subject_description_ru=f"Описание предмета {i}",
+        )
+        for i in range(1, 41)
+    ]
+    teachers = [
+        Teacher(
+            id=i,
+            user_id=1000 + i,
+            first_name_en=f"First{i}",
+            first_name_ru=f"Имя{i}",
+            last_name_en=f"Last{i}",
+            last_name_ru=f"Фамилия{i}",
+            patronymic_en=f"Patronymic{i}",
+            patronymic_ru=f"Отчество{i}",
+            phone="+70000000000",
+        )
+        for i in range(1, 31)
+    ]
+    lesson_types = [
+        LessonType(id=i, name_en=name, name_ru=name)
+        for i, name in enumerate(("Lecture", "Practical", "Laboratory"), start=1)
+    ]
+    sites = [
+        Site(
+            id=i,
+            site_name_en=f"S{i}",
+            site_name_ru=f"К{i}",
+            site_description_en=None,
+            site_description_ru=None,
+        )
+        for i in range(1, 5)
+    ]
+    groups = [
+        Group(
+            id=i,
+            group_name_en=f"Group-{i}",
+            group_name_ru=f"Группа-{i}",
+            group_description_en=None,
+            group_description_ru=None,
+        )
+        for i in range(1, 61)
+    ]
+
+    schedules = []
+    for i in range(1, lessons + 1):
+        schedule = TermSchedule(
+            id=i,
+            term_id=term.id,
+            term=term,
+            week_type=week_type,
+            day_of_week=days[rng.randrange(6)],
+            lesson_period=rng.choice(periods),
+            subject=rng.choice(subjects),
+            teacher=rng.choice(teachers),
+            lesson_type=rng.choice(lesson_types),
+            site=rng.choice(sites),
+            room_number=str(rng.randint(100, 599)),
+            is_virtual=False,
+        )
+        schedule.schedule_groups = [
+            ScheduleGroup(schedule_id=i, group_id=group.id, group=group)
+            for group in rng.sample(groups, groups_per_lesson)
+        ]
+        schedules.append(schedule)
+
+    schedules.sort(
+        key=lambda s: (s.day_of_week.day_number, s.lesson_period.lesson_number)
+    )
+    return schedules
+
+
+# ------------------- Alternative mappers -------------------
+
+
+def _name(en: str, ru: str) -> LocalizedNameField:
+    return LocalizedNameField.model_construct(en=en, ru=ru)
+
+
+def _description(en: Any, ru: Any) -> LocalizedDescriptionField:
+    return LocalizedDescriptionField.model_construct(en=en, ru=ru)
+
+
+def construct_lesson(schedule: TermSchedule, model=DayLessonResponse):
+    """Same response as the service, built with model_construct (no validation)"""
+    period, subject = schedule.lesson_period, schedule.subject
+    teacher, site = schedule.teacher, schedule.site
+    day, week_type = schedule.day_of_week, schedule.week_type
+    return model.model_construct(
+        id=schedule.id,
+        lesson_period=LessonPeriodResponse.model_construct(
+            id=period.id,
+            lesson_number=period.lesson_number,
+            start_time=time_to_iso(period.start_time),
+            end_time=time_to_iso(period.end_time),
+        ),
+        subject=SubjectResponse.model_construct(
+            id=subject.id,
+            name=_name(subject.subject_name_en, subject.subject_name_ru),
+            description=_description(
+                subject.subject_description_en, subject.subject_description_ru
+            ),
+        ),
+        teacher=TeacherResponse.model_construct(
+            id=teacher.id,
+            user_id=teacher.user_id,
+            first_name=_name(teacher.first_name_en, teacher.first_name_ru),
+            last_name=_name(teacher.last_name_en, teacher.last_name_ru),
+            patronymic=_name(teacher.patronymic_en, teacher.patronymic_ru),
+            phone=teacher.phone,
+        ),
+        lesson_type=LessonTypeResponse.model_construct(
+            id=schedule.lesson_type.id,
+            name=_name(schedule.lesson_type.name_en, schedule.lesson_type.name_ru),
+        ),
+        location=LocationResponse.model_construct(
+            site=SiteResponse.model_construct(
+                id=site.id,
+                name=_name(site.site_name_en, site.site_name_ru),
+                description=_description(
+                    site.site_description_en, site.site_description_ru
+                ),
+            ),
+            room_number=schedule.room_number,
+            is_virtual=schedule.is_virtual,
+        ),
+        schedule=ScheduleResponse.model_construct(
+            term_id=schedule.term_id,
+            day_of_week=DayOfWeekResponse.model_construct(
+                id=day.id,
+                day_number=day.day_number,
+                name=_name(day.name_en, day.name_ru),
+            ),
+            week_type=WeekTypeResponse.model_construct(
+                id=week_type.id, name=_name(week_type.name_en, week_type.name_ru)
+            ),
+        ),
+        groups=[
+            GroupResponse.model_construct(
+                id=sg.group.id,
+                name=_name(sg.group.group_name_en, sg.group.group_name_ru),
+                description=_description(
+                    sg.group.group_description_en, sg.group.group_description_ru
+                ),
+            )
+            for sg in schedule.schedule_groups
+            if sg.group
+        ],
+    )
+
+
+def dict_lesson(schedule: TermSchedule) -> Dict[str, Any]:
+    """Same JSON shape as plain dicts"""
+    period, subject = schedule.lesson_period, schedule.subject
+    teacher, site = schedule.teacher, schedule.site
+    day, week_type = schedule.day_of_week, schedule.week_type
+    return {
+        "id": schedule.id,
+        "lesson_period": {
+            "id": period.id,
+            "lesson_number": period.lesson_number,
+            "start_time": time_to_iso(period.start_time),
+            "end_time": time_to_iso(period.end_time),
+        },
+        "subject": {
+            "id": subject.id,
+            "name": {"ru": subject.subject_name_ru, "en": subject.subject_name_en},
+            "description": {
+                "en": subject.subject_description_en,
+                "ru": subject.subject_description_ru,
+            },
+        },
+        "teacher": {
+            "id": teacher.id,
+            "user_id": teacher.user_id,
+            "first_name": {"ru": teacher.first_name_ru, "en": teacher.first_name_en},
+            "last_name": {"ru": teacher.last_name_ru, "en": teacher.last_name_en},
+            "patronymic": {"ru": teacher.patronymic_ru, "en": teacher.patronymic_en},
+            "phone": teacher.phone,
+        },
+        "lesson_type": {
+            "id": schedule.lesson_type.id,
+            "name": {
+                "ru": schedule.lesson_type.name_ru,
+                "en": schedule.lesson_type.name_en,
+            },
+        },
+        "location": {
+            "site": {
+                "id": site.id,
+                "name": {"ru": site.site_name_ru, "en": site.site_name_en},
+                "description": {
+                    "en": site.site_description_en,
+                    "ru": site.site_description_ru,
+                },
+            },
+            "room_number": schedule.room_number,
+            "is_virtual": schedule.is_virtual,
+        },
+        "schedule": {
+            "term_id": schedule.term_id,
+            "day_of_week": {
+                "id": day.id,
+                "day_number": day.day_number,
+                "name": {"ru": day.name_ru, "en": day.name_en},
+            },
+            "week_type": {
+                "id": week_type.id,
+                "name": {"ru": week_type.name_ru, "en": week_type.name_en},
+            },
+        },
+        "groups": [
+            {
+                "id": sg.group.id,
+                "name": {"ru": sg.group.group_name_ru, "en": sg.group.group_name_en},
+                "description": {
+                    "en": sg.group.group_description_en,
+                    "ru": sg.group.group_description_ru,
+                },
+            }
+            for sg in schedule.schedule_groups
+            if sg.group
+        ],
+    }
+
+
+class _Forgetful(dict):
+    """Mapping cache that never keeps anything"""
+
+    def __setitem__(self, key, value):
+        pass
+
+
+def _empty_week() -> "OrderedDict[str, list]":
+    return OrderedDict((day, []) for day in WEEKDAY_ORDER)
+
+
+# ------------------- Cases -------------------
+
+# name -> (unit, async callable over the whole schedule list)
+Case = Tuple[str, Callable[[List[TermSchedule]], Awaitable[Any]]]
+
+
+def build_cases() -> Dict[str, Case]:
+    def service() -> ScheduleService:
+        # Mapping never touches the session
+        return ScheduleService(db=None)
+
+    async def lesson_pydantic(schedules):
+        mapper = service()
+        for schedule in schedules:
+            mapper.map_to_lesson_response(schedule).model_dump_json()
+
+    async def lesson_construct(schedules):
+        for schedule in schedules:
+            construct_lesson(schedule).model_dump_json()
+
+    async def lesson_dict(schedules):
+        for schedule in schedules:
+            json.dumps(dict_lesson(schedule), ensure_ascii=False)
+
+    async def week_pydantic(schedules):
+        structure = await service().build_weekly_structure(schedules)
+        return WeekAdapter.dump_json(structure)
+
+    async def week_unmemoized(schedules):
+        # Same as week/pydantic, with every lesson mapping its own sub-objects
+        mapper = service()
+        mapper._mapped = _Forgetful()
+        structure = await mapper.build_weekly_structure(schedules)
+        return WeekAdapter.dump_json(structure)
+
+    async def week_fastapi(schedules):
+        # What FastAPI does with response_model: dump, re-validate, serialize
+        structure = await service().build_weekly_structure(schedules)
+        content = {
+            day: [lesson.model_dump() for lesson in lessons]
+            for day, lessons in structure.items()
+        }
+        return WeekAdapter.dump_json(WeekAdapter.validate_python(content))
+
+    async def week_construct(schedules):
+        structure = _empty_week()
+        for schedule in schedules:
+            structure[schedule.day_of_week.name_en].append(
+                construct_lesson(schedule, WeekLessonResponse)
+            )
+        return WeekAdapter.dump_json(structure)
+
+    async def week_dict(schedules):
+        structure = _empty_week()
+        for schedule in schedules:
+            structure[schedule.day_of_week.name_en].append(dict_lesson(schedule))
+        return json.dumps(structure, ensure_ascii=False).encode()
+
+    async def week_compact(schedules):
+        # format=compact: ids in lessons, each entity serialized once
+        return (
+            service().build_compact_weekly_structure(schedules).model_dump_json()
+        ).encode()
+
+    return {
+        "lesson/pydantic": ("per lesson", lesson_pydantic),
+        "lesson/construct": ("per lesson", lesson_construct),
+        "lesson/dict": ("per lesson", lesson_dict),
+        "week/pydantic": ("per week", week_pydantic),
+        "week/unmemoized": ("per week", week_unmemoized),
+        "week/fastapi": ("per week", week_fastapi),
+        "week/construct": ("per week", week_construct),
+        "week/dict": ("per week", week_dict),
+        "week/compact": ("per week", week_compact),
+    }
+
+
+async def measure(
+    func: Callable[[List[TermSchedule]], Awaitable[Any]],
+    schedules: List[TermSchedule],
+    repeat: int,
+) -> Tuple[float, Any]:
+    """Best of `repeat` runs over the whole schedule list in seconds, and output"""
+    # Also warms up pydantic's and SQLAlchemy's lazy setup
+    output = await func(schedules)
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        await func(schedules)
+        best = min(best, time.perf_counter() - started_at)
+    return best, output
+
+
+async def run(args: argparse.Namespace) -> Dict[str, float]:
+    schedules = build_schedules(args.lessons, args.groups_per_lesson)
+    results = {}
+    for name, (unit, func) in build_cases().items():
+        if args.only and not name.startswith(args.only):
+            continue
+        elapsed, body = await measure(func, schedules, args.repeat)
+        # Lesson cases report the cost of one lesson, week cases of one week
+        per_op = elapsed / len(schedules) if unit == "per lesson" else elapsed
+        results[name] = per_op
+        size = f"{len(body) / 1024:10.1f} KiB" if body is not None else ""
+        print(f"{name:<20} {per_op * 1e6:12.1f} µs {unit}{size}")
+    return results
+
+
+def check(results: Dict[str, float], args: argparse.Namespace) -> int:
+    if not args.baseline.is_file():
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return 1
+
+    saved = json.loads(args.baseline.read_text())
+    if (saved["lessons"], saved["groups_per_lesson"]) != (
+        args.lessons,
+        args.groups_per_lesson,
+    ):
+        print("Baseline was recorded with a different --lessons/--groups-per-lesson")
+        return 1
+
+    baseline = saved["results"]
+    regressions = 0
+    for name, per_op in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        ratio = per_op / expected
+        status = "REGRESSION" if ratio > 1 + args.tolerance else "ok"
+        print(f"[{status}] {name}: {ratio:.2f}x baseline")
+        regressions += status != "ok"
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lessons", type=int, default=500)
+    parser.add_argument("--groups-per-lesson", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", help="Run only cases with this prefix, e.g. week/")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--check", action="store_true", help="Exit 1 on a regression vs baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown before --check fails (0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "lessons": args.lessons,
+                    "groups_per_lesson": args.groups_per_lesson,
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+        print(f"Baseline saved to {args.baseline}")
+    if args.check:
+        return check(results, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
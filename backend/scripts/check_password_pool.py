@@ -0,0 +1,168 @@
+"""
+Password pool check: every UserManager path that hashes or verifies a
+password must do it in the worker pool, never on the event loop.
+
+Runs each path against a throwaway SQLite database and fake Redis, and
+fails if one submits no pool job, hashes on the event loop thread, or
+leaves a password that no longer logs in.
+
+    pip install -r requirements-dev.txt
+    python -m scripts.check_password_pool
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Awaitable, Callable, List, Tuple
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent.parent / ".benchmarks"
+EMAIL = "pool-check@example.com"
+
+
+def configure_environment() -> None:
+    """Settings are read at import time, so this runs before importing app"""
+    database = BENCHMARKS_DIR / "password_pool.sqlite3"
+    database.parent.mkdir(parents=True, exist_ok=True)
+    database.unlink(missing_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database}"
+    os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
+    os.environ["LOG_LEVEL"] = "WARNING"
+    # A process pool wouldn't see the thread recorder below
+    os.environ["PASSWORD_HASH_USE_PROCESSES"] = "false"
+
+
+class ThreadRecorder:
+    """Counts synchronous hasher calls made on the event loop thread"""
+
+    def __init__(self, helper):
+        self.loop_thread = threading.get_ident()
+        self.on_loop = 0
+        for name in ("hash", "verify_and_update"):
+            setattr(helper, name, self._wrap(getattr(helper, name)))
+
+    def _wrap(self, func):
+        def wrapper(*args, **kwargs):
+            self.on_loop += threading.get_ident() == self.loop_thread
+            return func(*args, **kwargs)
+
+        return wrapper
+
+
+async def run_checks() -> List[Tuple[str, int, int, str]]:
+    from scripts.loadtest import use_fake_redis
+
+    use_fake_redis()
+
+    from fastapi_users.db import SQLAlchemyUserDatabase
+
+    from app import passwords
+    from app.auth import UserManager
+    from app.database import async_session, engine
+    from app.global_schemas import UserCreate, UserUpdate
+    from app.models import Base, Role, User
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    recorder = ThreadRecorder(passwords._helper)
+    results = []
+
+    async with async_session() as db:
+        role = Role(role_name_en="Teacher", role_name_ru="Преподаватель")
+        db.add(role)
+        await db.commit()
+
+        manager = UserManager(SQLAlchemyUserDatabase(db, User))
+        tokens = []
+
+        async def capture_token(user, token, request=None):
+            tokens.append(token)
+
+        manager.on_after_forgot_password = capture_token
+
+        def login(password: str, email: str = EMAIL):
+            return manager.authenticate(
+                SimpleNamespace(username=email, password=password)
+            )
+
+        async def check(
+            name: str,
+            call: Callable[[], Awaitable],
+            valid: Callable[[object], bool] = lambda result: True,
+        ) -> None:
+            submitted = passwords.password_helper.stats.submitted
+            on_loop = recorder.on_loop
+            result = await call()
+            jobs = passwords.password_helper.stats.submitted - submitted
+            loop_calls = recorder.on_loop - on_loop
+            problems = []
+            if not jobs:
+                problems.append("no pool job")
+            if loop_calls:
+                problems.append("hashed on the event loop")
+            if not valid(result):
+                problems.append("unexpected result")
+            results.append((name, jobs, loop_calls, ", ".join(problems)))
+
+        await check(
+            "create",
+            lambda: manager.create(
+                UserCreate(email=EMAIL, password="first", role_id=role.id)
+            ),
+        )
+        await check("login", lambda: login("first"), lambda u: u is not None)
+        await check(
+            "login (wrong password)", lambda: login("wrong"), lambda u: u is None
+        )
+        await check(
+            "login (unknown email)",
+            lambda: login("first", "nobody@example.com"),
+            lambda u: u is None,
+        )
+
+        user = await manager.get_by_email(EMAIL)
+        await check(
+            "update password",
+            lambda: manager.update(
+                UserUpdate(password="second", role_id=role.id), user
+            ),
+        )
+        await check("login (updated)", lambda: login("second"), lambda u: u is not None)
+
+        user = await manager.get_by_email(EMAIL)
+        await check("forgot password", lambda: manager.forgot_password(user))
+        await check(
+            "reset password", lambda: manager.reset_password(tokens[-1], "third")
+        )
+        await check("login (reset)", lambda: login("third"), lambda u: u is not None)
+
+    await engine.dispose()
+    passwords.password_helper.shutdown()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args()
+    configure_environment()
+
+    results = asyncio.run(run_checks())
+    failures = 0
+    print(f"{'path':<26}{'pool jobs':>10}{'on loop':>9}  status")
+    for name, jobs, loop_calls, problems in results:
+        failures += bool(problems)
+        print(
+            f"{name:<26}{jobs:>10}{loop_calls:>9}  "
+            f"{'FAIL: ' + problems if problems else 'ok'}"
+        )
+    print(f"{len(results)} paths checked, {failures} failing")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
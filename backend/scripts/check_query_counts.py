@@ -0,0 +1,428 @@
+"""
+Query-count guard: SQL and Redis commands per endpoint must not grow with data.
+
+Seeds a small and a large dataset (SQLite and fake Redis, no services
+needed), calls every endpoint in CASES in process against each, and fails
+if any endpoint issues more SQL statements or Redis commands on the larger
+one. That is the signature of an N+1.
+
+Not covered: the fastapi-users auth and /users routes, /health,
+/debug/clear-attendance, which deletes data, and timetable import, whose
+work grows with the uploaded file by design. To cover a new endpoint, add
+an EndpointCase to CASES.
+
+    pip install -r requirements-dev.txt
+    python -m scripts.check_query_counts
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent.parent / ".benchmarks"
+PASSWORD = "password"
+SCRAPE_TOKEN = "scrape-token"
+
+# Dataset sizes passed to scripts.generate_dataset
+SIZES = {
+    "small": {"--groups": 3, "--teachers": 6, "--students": 30},
+    "large": {"--groups": 12, "--teachers": 24, "--students": 360},
+}
+
+
+@dataclass
+class Samples:
+    """Ids and credentials picked from the seeded dataset"""
+
+    teacher_email: str
+    teacher_user_id: int
+    student_email: str
+    admin_email: str
+    target_date: date
+    schedule_id: int
+    subject_id: int
+    session_key: str = ""
+
+
+@dataclass
+class EndpointCase:
+    name: str
+    method: str
+    path: str
+    user: str  # "teacher", "student", "admin" or "scraper"
+    params: Callable[[Samples], Dict[str, Any]] = lambda samples: {}
+    json: Optional[Callable[[Samples], Dict[str, Any]]] = None
+    # Measured cold and then again with caches filled; off for calls that
+    # change state, such as confirming attendance twice
+    repeatable: bool = True
+    expected_status: int = 200
+
+
+def _qr(samples: Samples) -> Dict[str, Any]:
+    from scripts.loadtest import encrypt_qr
+
+    payload = {"schedule_id": samples.schedule_id, "timestamp": time.time()}
+    return {
+        "data": encrypt_qr(samples.session_key, payload),
+        "teacher_id": samples.teacher_user_id,
+    }
+
+
+CASES: List[EndpointCase] = [
+    EndpointCase("profile (teacher)", "GET", "/profile/me", "teacher"),
+    EndpointCase("profile (student)", "GET", "/profile/me", "student"),
+    EndpointCase(
+        "profile (lang)",
+        "GET",
+        "/profile/me",
+        "teacher",
+        params=lambda s: {"lang": "ru"},
+    ),
+    EndpointCase(
+        "teacher day",
+        "GET",
+        "/teacher/schedule/day",
+        "teacher",
+        params=lambda s: {"target_date": s.target_date.isoformat()},
+    ),
+    EndpointCase(
+        "teacher day (mine)",
+        "GET",
+        "/teacher/schedule/day",
+        "teacher",
+        params=lambda s: {
+            "target_date": s.target_date.isoformat(),
+            "only_for_me": True,
+        },
+    ),
+    EndpointCase(
+        "teacher week",
+        "GET",
+        "/teacher/schedule/week",
+        "teacher",
+        params=lambda s: {"week_type": "upper"},
+    ),
+    EndpointCase(
+        "teacher week (mine)",
+        "GET",
+        "/teacher/schedule/week",
+        "teacher",
+        params=lambda s: {"week_type": "upper", "only_for_me": True},
+    ),
+    EndpointCase(
+        "teacher week (compact)",
+        "GET",
+        "/teacher/schedule/week",
+        "teacher",
+        params=lambda s: {"week_type": "upper", "format": "compact"},
+    ),
+    EndpointCase(
+        "teacher week (lang)",
+        "GET",
+        "/teacher/schedule/week",
+        "teacher",
+        params=lambda s: {"week_type": "upper", "lang": "en"},
+    ),
+    EndpointCase(
+        "teacher week (fields)",
+        "GET",
+        "/teacher/schedule/week",
+        "teacher",
+        params=lambda s: {
+            "week_type": "upper",
+            "fields": "lesson_period,subject,location",
+        },
+    ),
+    EndpointCase("teacher groups", "GET", "/teacher/schedule/groups", "teacher"),
+    EndpointCase(
+        "student day",
+        "GET",
+        "/student/schedule/day",
+        "student",
+        params=lambda s: {"target_date": s.target_date.isoformat()},
+    ),
+    EndpointCase(
+        "student week",
+        "GET",
+        "/student/schedule/week",
+        "student",
+        params=lambda s: {"week_type": "upper"},
+    ),
+    EndpointCase(
+        "attendance day",
+        "GET",
+        "/attendance/day",
+        "teacher",
+        params=lambda s: {
+            "subject_id": s.subject_id,
+            "lesson_date": s.target_date.isoformat(),
+        },
+    ),
+    EndpointCase(
+        "attendance confirm",
+        "POST",
+        "/attendance/confirm",
+        "student",
+        json=_qr,
+        repeatable=False,
+        expected_status=201,
+    ),
+    EndpointCase("session create", "POST", "/session/create", "teacher"),
+    EndpointCase("debug sessions", "GET", "/debug/sessions", "admin"),
+    EndpointCase(
+        "attendance report",
+        "GET",
+        "/reports/attendance",
+        "admin",
+        params=lambda s: {"subject_id": s.subject_id, "limit": 50},
+    ),
+    EndpointCase("slow queries", "GET", "/debug/slow-queries", "admin"),
+    EndpointCase("profiles", "GET", "/debug/profiles", "admin"),
+    EndpointCase("metrics (passwords)", "GET", "/metrics/passwords", "admin"),
+    EndpointCase("metrics (db)", "GET", "/metrics/db", "admin"),
+    EndpointCase("metrics (redis)", "GET", "/metrics/redis", "admin"),
+    EndpointCase("prometheus", "GET", "/metrics", "scraper"),
+]
+
+
+# ------------------- Measuring one dataset (child process) -------------------
+
+
+async def pick_samples() -> Samples:
+    from sqlalchemy import func, select
+
+    from app.database import async_session
+    from app.models import ScheduleGroup, Student, Teacher, TermSchedule, User
+    from app.services.schedule import ScheduleService
+    from app.utils.date_utils import get_current_date
+
+    async with async_session() as db:
+        today = get_current_date()
+        term = await ScheduleService(db).get_active_term(today)
+        if term is None:
+            raise SystemExit("No active term in the seeded dataset")
+        # Monday of this week: generated timetables run Monday to Friday
+        target_date = max(term.start_date, today - timedelta(days=today.weekday()))
+
+        teacher_id = (
+            await db.execute(
+                select(TermSchedule.teacher_id)
+                .where(TermSchedule.term_id == term.id)
+                .group_by(TermSchedule.teacher_id)
+                .order_by(func.count().desc(), TermSchedule.teacher_id)
+                .limit(1)
+            )
+        ).scalar_one()
+        lesson = (
+            await db.execute(
+                select(TermSchedule)
+                .where(TermSchedule.teacher_id == teacher_id)
+                .order_by(TermSchedule.id)
+                .limit(1)
+            )
+        ).scalar_one()
+        teacher_user_id, teacher_email = (
+            await db.execute(
+                select(User.id, User.email)
+                .join(Teacher, Teacher.user_id == User.id)
+                .where(Teacher.id == teacher_id)
+            )
+        ).one()
+        student_email = (
+            await db.execute(
+                select(User.email)
+                .join(Student, Student.user_id == User.id)
+                .join(ScheduleGroup, ScheduleGroup.group_id == Student.group_id)
+                .where(ScheduleGroup.schedule_id == lesson.id)
+                .order_by(Student.id)
+                .limit(1)
+            )
+        ).scalar_one()
+
+    return Samples(
+        teacher_email=teacher_email,
+        teacher_user_id=teacher_user_id,
+        student_email=student_email,
+        admin_email="admin@example.com",
+        target_date=target_date,
+        schedule_id=lesson.id,
+        subject_id=lesson.subject_id,
+    )
+
+
+async def seed_sessions() -> None:
+    """A session per teacher, so session listings grow with the dataset"""
+    from sqlalchemy import select
+
+    from app.database import async_session
+    from app.models import Teacher
+    from app.redis import redis_client
+
+    async with async_session() as db:
+        teachers = (await db.execute(select(Teacher.id, Teacher.user_id))).all()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for teacher_id, user_id in teachers:
+            key = secrets.token_urlsafe(32)
+            pipe.set(key, str(teacher_id), ex=3600)
+            pipe.set(f"session:{user_id}", key, ex=3600)
+        await pipe.execute()
+
+
+async def measure(size: str) -> Dict[str, Dict[str, Any]]:
+    from scripts.loadtest import use_fake_redis
+
+    use_fake_redis()
+
+    from app.database import engine
+    from app.instrumentation import capture_request_stats
+    from app.models import Base
+    from scripts.generate_dataset import generate, parse_args
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    dataset_args = {
+        "--terms": 1,
+        "--subjects": 20,
+        "--attendance-weeks": 1,
+        "--password": PASSWORD,
+        **SIZES[size],
+    }
+    await generate(
+        parse_args([str(part) for item in dataset_args.items() for part in item])
+    )
+    samples = await pick_samples()
+    await seed_sessions()
+
+    from app.main import app
+
+    results = {}
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://counts/api"
+    ) as client:
+        tokens = {}
+        for role, email in (
+            ("teacher", samples.teacher_email),
+            ("student", samples.student_email),
+            ("admin", samples.admin_email),
+        ):
+            response = await client.post(
+                "/auth/jwt/login", data={"username": email, "password": PASSWORD}
+            )
+            response.raise_for_status()
+            tokens[role] = response.json()["access_token"]
+
+        tokens["scraper"] = SCRAPE_TOKEN
+
+        response = await client.post(
+            "/session/create",
+            headers={"Authorization": f"Bearer {tokens['teacher']}"},
+        )
+        samples.session_key = response.json()["session_key"]
+
+        for case in CASES:
+
+            async def call():
+                return await client.request(
+                    case.method,
+                    case.path,
+                    params=case.params(samples),
+                    json=case.json(samples) if case.json else None,
+                    headers={"Authorization": f"Bearer {tokens[case.user]}"},
+                )
+
+            runs = [case.name, f"{case.name} (cached)"]
+            for name in runs if case.repeatable else runs[:1]:
+                with capture_request_stats() as stats:
+                    response = await call()
+                results[name] = {
+                    "status": response.status_code,
+                    "expected_status": case.expected_status,
+                    "db_queries": stats.db_queries,
+                    "redis_commands": stats.redis_commands,
+                }
+
+    await engine.dispose()
+    return results
+
+
+def configure_environment(size: str) -> None:
+    """Settings are read at import time, so this runs before importing app"""
+    database = BENCHMARKS_DIR / f"query_counts_{size}.sqlite3"
+    database.parent.mkdir(parents=True, exist_ok=True)
+    database.unlink(missing_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database}"
+    os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
+    os.environ["LOG_LEVEL"] = "WARNING"
+    # The harness captures counts itself; the middleware would shadow them
+    os.environ["REQUEST_INSTRUMENTATION_SAMPLE_RATE"] = "0"
+    os.environ["SLOW_QUERY_THRESHOLD_MS"] = "1000000"
+    os.environ["PROMETHEUS_SCRAPE_TOKEN"] = SCRAPE_TOKEN
+
+
+# ------------------- Comparing (parent process) -------------------
+
+
+def run_size(size: str) -> Dict[str, Dict[str, Any]]:
+    # A fresh interpreter per size: settings and the engine are module state
+    output = subprocess.run(
+        [sys.executable, "-m", "scripts.check_query_counts", "--measure", size],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(small: Dict[str, Dict], large: Dict[str, Dict]) -> int:
+    failures = 0
+    print(f"{'endpoint':<33}{'sql':>10}{'redis':>10}  status")
+    for name, before in small.items():
+        after = large[name]
+        problems = []
+        if after["db_queries"] > before["db_queries"]:
+            problems.append("SQL count grows with data")
+        if after["redis_commands"] > before["redis_commands"]:
+            problems.append("Redis count grows with data")
+        for result in (before, after):
+            if result["status"] != result["expected_status"]:
+                problems.append(f"HTTP {result['status']}")
+                break
+
+        failures += bool(problems)
+        print(
+            f"{name:<33}"
+            f"{before['db_queries']:>4} ->{after['db_queries']:>3}"
+            f"{before['redis_commands']:>4} ->{after['redis_commands']:>3}  "
+            f"{'FAIL: ' + ', '.join(problems) if problems else 'ok'}"
+        )
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--measure", choices=SIZES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        configure_environment(args.measure)
+        print(json.dumps(asyncio.run(measure(args.measure))))
+        return 0
+
+    failures = compare(run_size("small"), run_size("large"))
+    print(f"{len(CASES)} endpoints checked, {failures} failing")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
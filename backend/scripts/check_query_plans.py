@@ -0,0 +1,210 @@
+"""
+Query plan regression check for the hot read paths.
+
+Runs the real service and dependency code against the configured database,
+captures every statement it sends, re-runs each one under EXPLAIN and fails
+if any plan sequentially scans one of the large tables.
+
+Seed a large dataset first so the planner makes realistic choices, or pass
+--disable-seqscan to check index coverage on a small database.
+
+    python -m scripts.check_query_plans [--disable-seqscan]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+
+from app.auth import get_current_active_student, get_current_active_teacher
+from app.database import async_session, engine
+from app.models import ScheduleGroup, Student, Teacher, TermSchedule, User
+from app.routers.attendance import get_attendance_for_day
+from app.services.schedule import ScheduleService
+from app.services.teacher_groups import TeacherGroupIndex
+from app.utils.date_utils import get_current_date
+
+# Tables that grow with the university; small lookup tables may be seq scanned
+LARGE_TABLES = {
+    "term_schedule",
+    "schedule_groups",
+    "students",
+    "teachers",
+    "users",
+    "attendance",
+}
+
+CapturedQuery = Tuple[str, str, Any]
+
+
+class QueryRecorder:
+    """Collects (label, statement, parameters) for every executed statement"""
+
+    def __init__(self):
+        self.queries: List[CapturedQuery] = []
+        self.label: Optional[str] = None
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.label and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.queries.append((self.label, statement, parameters))
+
+    @contextmanager
+    def scope(self, label: str) -> Iterator[None]:
+        self.label = label
+        try:
+            yield
+        finally:
+            self.label = None
+
+
+def find_seq_scans(plan: Dict[str, Any]) -> List[str]:
+    """Walk an EXPLAIN (FORMAT JSON) plan tree and return seq scanned tables"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child))
+    return found
+
+
+async def pick_samples(session) -> Dict[str, Any]:
+    """Choose a busy teacher, a student with a group and a date in the active term"""
+    schedule_service = ScheduleService(session)
+    today = get_current_date()
+    term = await schedule_service.get_active_term(today)
+    if term is None:
+        raise SystemExit("No active term found; seed the database first.")
+
+    teacher_id, subject_id = (
+        await session.execute(
+            select(TermSchedule.teacher_id, TermSchedule.subject_id)
+            .where(TermSchedule.term_id == term.id)
+            .group_by(TermSchedule.teacher_id, TermSchedule.subject_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+    ).one()
+    teacher = await session.get(Teacher, teacher_id)
+
+    student = (
+        await session.execute(
+            select(Student)
+            .join(ScheduleGroup, ScheduleGroup.group_id == Student.group_id)
+            .limit(1)
+        )
+    ).scalar_one()
+
+    # First weekday in the term, so the day queries have lessons to find
+    target_date = max(term.start_date, min(today, term.end_date))
+    while target_date.isoweekday() == 7:
+        target_date += timedelta(days=1)
+
+    return dict(
+        term=term,
+        teacher=teacher,
+        subject_id=subject_id,
+        student=student,
+        target_date=target_date,
+    )
+
+
+async def capture_hot_queries(recorder: QueryRecorder) -> None:
+    async with async_session() as session:
+        samples = await pick_samples(session)
+        term, teacher, student = samples["term"], samples["teacher"], samples["student"]
+        schedule_service = ScheduleService(session)
+
+        with recorder.scope("auth: teacher profile"):
+            user = await session.get(User, teacher.user_id)
+            await get_current_active_teacher(user, session)
+        with recorder.scope("auth: student profile"):
+            user = await session.get(User, student.user_id)
+            await get_current_active_student(user, session)
+
+        with recorder.scope("schedule: teacher day"):
+            await schedule_service.get_teacher_daily_schedules(
+                term.id, samples["target_date"], teacher.id
+            )
+        with recorder.scope("schedule: student day"):
+            await schedule_service.get_student_daily_schedules(
+                term.id, samples["target_date"], student.id
+            )
+        with recorder.scope("schedule: teacher week"):
+            await schedule_service.get_teacher_weekly_schedules(
+                term_id=term.id, week_type="upper", teacher_id=teacher.id
+            )
+        with recorder.scope("schedule: student week"):
+            await schedule_service.get_student_weekly_schedules(
+                term_id=term.id, week_type="upper", student_id=student.id
+            )
+        with recorder.scope("schedule: teacher groups index"):
+            await TeacherGroupIndex()._build_term(session, term.id)
+
+        with recorder.scope("attendance: day report"):
+            try:
+                await get_attendance_for_day(
+                    subject_id=samples["subject_id"],
+                    lesson_date=samples["target_date"],
+                    db=session,
+                    current_teacher=teacher,
+                    lang="en",
+                )
+            except HTTPException:
+                pass  # an empty report still ran its queries
+
+
+async def explain(queries: List[CapturedQuery], disable_seqscan: bool) -> int:
+    failures = 0
+    async with engine.connect() as conn:
+        if disable_seqscan:
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+
+        for label, statement, parameters in queries:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}", parameters
+            )
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            seq_scans = find_seq_scans(plan[0]["Plan"])
+
+            status = "FAIL" if seq_scans else "ok"
+            print(f"[{status}] {label}")
+            if seq_scans:
+                failures += 1
+                print(f"       seq scan on: {', '.join(sorted(set(seq_scans)))}")
+                print(f"       {' '.join(statement.split())[:200]}")
+
+    return failures
+
+
+async def main(disable_seqscan: bool) -> int:
+    recorder = QueryRecorder()
+    event.listen(engine.sync_engine, "before_cursor_execute", recorder)
+    try:
+        await capture_hot_queries(recorder)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", recorder)
+
+    failures = await explain(recorder.queries, disable_seqscan)
+    await engine.dispose()
+
+    print(f"{len(recorder.queries)} statements checked, {failures} with seq scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--disable-seqscan",
+        action="store_true",
+        help="Discourage seq scans so a missing index shows up on small datasets",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.disable_seqscan)))
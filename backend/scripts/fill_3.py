@@ -2,7 +2,6 @@ import asyncio
 from datetime import datetime, date, time
 from typing import List, Dict, Tuple, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from passlib.context import CryptContext
 
 from app.database import async_session
 from app.models import (
@@ -22,13 +21,12 @@ from app.models import (
     TermSchedule,
     ScheduleGroup,
 )
+from app.passwords import password_helper
 
-# Настройка хеширования паролей
-pwd_context = CryptContext(schemes=["argon2"])
 
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    """Хеширует пароль в пуле воркеров, не блокируя event loop."""
+    return await password_helper.hash(password)
 
 
 def to_time(time_str: str) -> time:
@@ -138,7 +136,7 @@ async def create_teachers(
     for data in teacher_data:
         user = User(
             email=data["email"],
-            hashed_password=get_password_hash("teacherpassword"),
+            hashed_password=await get_password_hash("teacherpassword"),
             role_id=teacher_role.id,
             is_verified=True,
         )
@@ -170,7 +168,7 @@ async def create_students(
         email = f"student{i}@example.com"
         user = User(
             email=email,
-            hashed_password=get_password_hash("studentpassword"),
+            hashed_password=await get_password_hash("studentpassword"),
             role_id=student_role.id,
             is_verified=True,
         )
@@ -0,0 +1,543 @@
+"""
+Bulk generator for a production-sized dataset.
+
+Builds N terms, groups, teachers, students, full upper/bottom timetables and
+weeks of attendance with chunked multi-row INSERTs and, on PostgreSQL, COPY
+for attendance. Every user shares one precomputed password hash, so the
+whole run costs a single argon2 call.
+
+Run it against an empty database (python -m scripts.clear first):
+
+    python -m scripts.generate_dataset [--groups 500] [--students 30000] ...
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.cache import apply_invalidations
+from app.database import engine
+from app.models import (
+    Administrator,
+    Attendance,
+    DayOfWeek,
+    Group,
+    LessonPeriod,
+    LessonType,
+    Role,
+    ScheduleGroup,
+    Site,
+    Student,
+    Subject,
+    Teacher,
+    Term,
+    TermSchedule,
+    User,
+    WeekType,
+)
+from app.passwords import password_helper
+
+DAYS = [
+    ("Monday", "Понедельник"),
+    ("Tuesday", "Вторник"),
+    ("Wednesday", "Среда"),
+    ("Thursday", "Четверг"),
+    ("Friday", "Пятница"),
+    ("Saturday", "Суббота"),
+    ("Sunday", "Воскресенье"),
+]
+PERIOD_TIMES = [
+    ("09:00", "10:35"),
+    ("10:50", "12:25"),
+    ("12:40", "14:15"),
+    ("14:30", "16:05"),
+    ("16:20", "17:55"),
+    ("18:00", "19:25"),
+    ("19:35", "21:00"),
+]
+SITES = ["Л", "Г", "Б", "Онлайн"]
+TERM_WEEKS = 18
+TERM_STRIDE_WEEKS = 26  # terms start half a year apart
+
+ATTENDANCE_COLUMNS = ["schedule_id", "lesson_date", "student_id", "scanned_at"]
+
+
+def chunked(rows: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def to_time(time_str: str):
+    return datetime.strptime(time_str, "%H:%M").time()
+
+
+class Loader:
+    """Chunked Core inserts on one connection and one transaction"""
+
+    def __init__(self, conn: AsyncConnection, chunk_size: int):
+        self.conn = conn
+        self.chunk_size = chunk_size
+
+    async def insert(self, model, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert rows and return their new ids in the order given"""
+        table = model.__table__
+        stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        ids: List[int] = []
+        for chunk in chunked(rows, self.chunk_size):
+            result = await self.conn.execute(stmt, chunk)
+            ids.extend(result.scalars().all())
+        return ids
+
+    async def insert_no_ids(self, model, rows: Sequence[Dict[str, Any]]) -> None:
+        for chunk in chunked(rows, self.chunk_size):
+            await self.conn.execute(insert(model.__table__), chunk)
+
+    async def copy_attendance(self, records: Iterable[Tuple]) -> int:
+        """COPY on asyncpg; chunked INSERTs on any other driver"""
+        total = 0
+        if self.conn.dialect.driver == "asyncpg":
+            raw = await self.conn.get_raw_connection()
+            for batch in _batches(records, self.chunk_size * 10):
+                await raw.driver_connection.copy_records_to_table(
+                    Attendance.__tablename__, records=batch, columns=ATTENDANCE_COLUMNS
+                )
+                total += len(batch)
+            return total
+
+        for batch in _batches(records, self.chunk_size):
+            await self.insert_no_ids(
+                Attendance, [dict(zip(ATTENDANCE_COLUMNS, row)) for row in batch]
+            )
+            total += len(batch)
+        return total
+
+
+def _batches(records: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    batch: List[Tuple] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ------------------- Reference data -------------------
+
+
+async def create_reference_data(
+    loader: Loader, subject_count: int
+) -> Dict[str, Any]:
+    role_ids = await loader.insert(
+        Role,
+        [
+            {"role_name_ru": "Администратор", "role_name_en": "Administrator"},
+            {"role_name_ru": "Преподаватель", "role_name_en": "Teacher"},
+            {"role_name_ru": "Студент", "role_name_en": "Student"},
+        ],
+    )
+    day_ids = await loader.insert(
+        DayOfWeek,
+        [
+            {"name_en": en, "name_ru": ru, "day_number": number}
+            for number, (en, ru) in enumerate(DAYS, start=1)
+        ],
+    )
+    week_type_ids = await loader.insert(
+        WeekType,
+        [
+            {"name_en": "upper", "name_ru": "Верхняя"},
+            {"name_en": "bottom", "name_ru": "Нижняя"},
+        ],
+    )
+    lesson_type_ids = await loader.insert(
+        LessonType,
+        [
+            {"name_en": "Lecture", "name_ru": "Лекция"},
+            {"name_en": "Practical", "name_ru": "Практическая"},
+            {"name_en": "Laboratory", "name_ru": "Лабораторная"},
+        ],
+    )
+    period_ids = await loader.insert(
+        LessonPeriod,
+        [
+            {
+                "lesson_number": number,
+                "start_time": to_time(start),
+                "end_time": to_time(end),
+            }
+            for number, (start, end) in enumerate(PERIOD_TIMES, start=1)
+        ],
+    )
+    site_ids = await loader.insert(
+        Site,
+        [
+            {
+                "site_name_ru": code,
+                "site_name_en": code,
+                "site_description_ru": f"Описание для корпуса {code}",
+                "site_description_en": f"Description for site {code}",
+            }
+            for code in SITES
+        ],
+    )
+    subject_ids = await loader.insert(
+        Subject,
+        [
+            {
+                "subject_name_ru": f"Предмет {i}",
+                "subject_name_en": f"Subject {i}",
+                "subject_description_ru": f"Описание для предмета {i}",
+                "subject_description_en": f"Description for subject {i}",
+            }
+            for i in range(1, subject_count + 1)
+        ],
+    )
+    return dict(
+        roles=dict(zip(("administrator", "teacher", "student"), role_ids)),
+        # Monday..Sunday -> id, in isoweekday order
+        days=dict(zip(range(1, 8), day_ids)),
+        week_types=dict(zip(("upper", "bottom"), week_type_ids)),
+        lesson_types=dict(
+            zip(("lecture", "practical", "laboratory"), lesson_type_ids)
+        ),
+        periods=period_ids,
+        period_starts=[to_time(start) for start, _ in PERIOD_TIMES],
+        sites=site_ids,
+        subjects=subject_ids,
+    )
+
+
+def term_dates(term_count: int, today: date) -> List[Tuple[date, date]]:
+    """Consecutive terms starting on Mondays; the newest one contains today"""
+    current_start = today - timedelta(days=today.weekday()) - timedelta(weeks=8)
+    starts = [
+        current_start - timedelta(weeks=TERM_STRIDE_WEEKS * offset)
+        for offset in reversed(range(term_count))
+    ]
+    return [
+        (start, start + timedelta(weeks=TERM_WEEKS) - timedelta(days=1))
+        for start in starts
+    ]
+
+
+# ------------------- People -------------------
+
+
+async def create_people(
+    loader: Loader, ref: Dict[str, Any], args: argparse.Namespace, hashed: str
+) -> Dict[str, Any]:
+    def user_row(email: str, role: str) -> Dict[str, Any]:
+        return {
+            "email": email,
+            "hashed_password": hashed,
+            "role_id": ref["roles"][role],
+            "is_active": True,
+            "is_superuser": False,
+            "is_verified": True,
+        }
+
+    def profile_row(user_id: int, first_en: str, first_ru: str) -> Dict[str, Any]:
+        return {
+            "user_id": user_id,
+            "first_name_ru": first_ru,
+            "first_name_en": first_en,
+            "last_name_ru": "Фамилия",
+            "last_name_en": "Lastname",
+            "patronymic_ru": "Отчество",
+            "patronymic_en": "Patronymic",
+            "phone": "",
+        }
+
+    admin_user_ids = await loader.insert(
+        User, [user_row("admin@example.com", "administrator")]
+    )
+    await loader.insert_no_ids(
+        Administrator, [profile_row(admin_user_ids[0], "Admin", "Администратор")]
+    )
+
+    teacher_user_ids = await loader.insert(
+        User,
+        [
+            user_row(f"teacher{i}@example.com", "teacher")
+            for i in range(1, args.teachers + 1)
+        ],
+    )
+    teacher_ids = await loader.insert(
+        Teacher,
+        [
+            profile_row(user_id, f"Teacher{i}", f"Преподаватель{i}")
+            for i, user_id in enumerate(teacher_user_ids, start=1)
+        ],
+    )
+
+    group_ids = await loader.insert(
+        Group,
+        [
+            {"group_name_ru": f"Группа-{i:04d}", "group_name_en": f"Group-{i:04d}"}
+            for i in range(1, args.groups + 1)
+        ],
+    )
+
+    student_user_ids = await loader.insert(
+        User,
+        [
+            user_row(f"student{i}@example.com", "student")
+            for i in range(1, args.students + 1)
+        ],
+    )
+    student_rows = []
+    for i, user_id in enumerate(student_user_ids, start=1):
+        row = profile_row(user_id, f"Student{i}", f"Студент{i}")
+        row["group_id"] = group_ids[(i - 1) % len(group_ids)]
+        student_rows.append(row)
+    student_ids = await loader.insert(Student, student_rows)
+
+    students_by_group: Dict[int, List[int]] = {group_id: [] for group_id in group_ids}
+    for row, student_id in zip(student_rows, student_ids):
+        students_by_group[row["group_id"]].append(student_id)
+
+    return dict(
+        teacher_ids=teacher_ids,
+        group_ids=group_ids,
+        students_by_group=students_by_group,
+    )
+
+
+# ------------------- Timetables -------------------
+
+
+def build_timetable(
+    rng: random.Random,
+    term_id: int,
+    ref: Dict[str, Any],
+    people: Dict[str, Any],
+    args: argparse.Namespace,
+) -> List[Tuple[Dict[str, Any], List[int]]]:
+    """
+    (term_schedule row, group ids) pairs for one term.
+
+    Groups are taught in streams: the first lesson of the day is a lecture
+    shared by the whole stream, the rest are per-group practicals. Within a
+    slot teachers are handed out round-robin, so nobody is double-booked.
+    """
+    group_ids = people["group_ids"]
+    teacher_ids = people["teacher_ids"]
+    streams = [
+        group_ids[start : start + args.stream_size]
+        for start in range(0, len(group_ids), args.stream_size)
+    ]
+
+    lessons = []
+    for week_type_id in ref["week_types"].values():
+        for day_number in range(1, args.days_per_week + 1):
+            for period_index in range(args.lessons_per_day):
+                offset = rng.randrange(len(teacher_ids))
+                if period_index == 0:
+                    lesson_type_id = ref["lesson_types"]["lecture"]
+                    slots = [(stream, lesson_type_id) for stream in streams]
+                else:
+                    lesson_type_id = ref["lesson_types"][
+                        rng.choice(("practical", "laboratory"))
+                    ]
+                    slots = [([group_id], lesson_type_id) for group_id in group_ids]
+
+                for i, (groups, lesson_type_id) in enumerate(slots):
+                    site_id = rng.choice(ref["sites"])
+                    row = {
+                        "term_id": term_id,
+                        "week_type_id": week_type_id,
+                        "day_of_week_id": ref["days"][day_number],
+                        "lesson_period_id": ref["periods"][period_index],
+                        "subject_id": rng.choice(ref["subjects"]),
+                        "teacher_id": teacher_ids[(offset + i) % len(teacher_ids)],
+                        "lesson_type_id": lesson_type_id,
+                        "site_id": site_id,
+                        "room_number": str(rng.randint(100, 599)),
+                        "is_virtual": site_id == ref["sites"][-1],
+                    }
+                    lessons.append((row, groups))
+    return lessons
+
+
+async def create_timetable(
+    loader: Loader, lessons: List[Tuple[Dict[str, Any], List[int]]]
+) -> List[int]:
+    schedule_ids = await loader.insert(TermSchedule, [row for row, _ in lessons])
+    await loader.insert_no_ids(
+        ScheduleGroup,
+        [
+            {"schedule_id": schedule_id, "group_id": group_id}
+            for schedule_id, (_, groups) in zip(schedule_ids, lessons)
+            for group_id in groups
+        ],
+    )
+    return schedule_ids
+
+
+# ------------------- Attendance -------------------
+
+
+def attendance_records(
+    rng: random.Random,
+    term_start: date,
+    first_day: date,
+    last_day: date,
+    ref: Dict[str, Any],
+    people: Dict[str, Any],
+    lessons: List[Tuple[Dict[str, Any], List[int]]],
+    schedule_ids: List[int],
+    rate: float,
+) -> Iterator[Tuple[int, date, int, datetime]]:
+    """Yields attendance rows lazily so months of data never sit in memory"""
+    week_type_by_id = {v: k for k, v in ref["week_types"].items()}
+    day_number_by_id = {v: k for k, v in ref["days"].items()}
+    period_start_by_id = dict(zip(ref["periods"], ref["period_starts"]))
+
+    by_slot: Dict[Tuple[str, int], List[Tuple[int, Dict[str, Any], List[int]]]] = {}
+    for schedule_id, (row, groups) in zip(schedule_ids, lessons):
+        key = (
+            week_type_by_id[row["week_type_id"]],
+            day_number_by_id[row["day_of_week_id"]],
+        )
+        by_slot.setdefault(key, []).append((schedule_id, row, groups))
+
+    day = first_day
+    while day <= last_day:
+        # Same rule as ScheduleService.calculate_week_type
+        weeks_passed = (day - term_start).days // 7
+        week_type = "upper" if weeks_passed % 2 == 0 else "bottom"
+        for schedule_id, row, groups in by_slot.get((week_type, day.isoweekday()), []):
+            period_start = period_start_by_id[row["lesson_period_id"]]
+            scanned_at = datetime.combine(day, period_start)
+            for group_id in groups:
+                for student_id in people["students_by_group"][group_id]:
+                    if rng.random() < rate:
+                        yield (
+                            schedule_id,
+                            day,
+                            student_id,
+                            scanned_at + timedelta(seconds=rng.randrange(600)),
+                        )
+        day += timedelta(days=1)
+
+
+# ------------------- Main -------------------
+
+
+async def generate(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    today = date.today()
+    started_at = time.perf_counter()
+
+    def report(message: str) -> None:
+        print(f"[{time.perf_counter() - started_at:7.1f}s] {message}")
+
+    hashed = await password_helper.hash(args.password)
+    password_helper.shutdown()
+
+    async with engine.begin() as conn:
+        existing = (
+            await conn.execute(select(func.count()).select_from(User))
+        ).scalar_one()
+        if existing:
+            raise SystemExit(
+                f"Database already has {existing} users; "
+                "run python -m scripts.clear first."
+            )
+
+        loader = Loader(conn, args.chunk_size)
+        ref = await create_reference_data(loader, args.subjects)
+        report("reference data")
+
+        people = await create_people(loader, ref, args, hashed)
+        report(
+            f"{args.teachers} teachers, {args.groups} groups, {args.students} students"
+        )
+
+        attendance_from = today - timedelta(weeks=args.attendance_weeks)
+        for number, (start, end) in enumerate(term_dates(args.terms, today), start=1):
+            [term_id] = await loader.insert(
+                Term,
+                [
+                    {
+                        "term_name_ru": f"Семестр {number} ({start.year})",
+                        "term_name_en": f"Term {number} ({start.year})",
+                        "start_date": start,
+                        "end_date": end,
+                    }
+                ],
+            )
+            lessons = build_timetable(rng, term_id, ref, people, args)
+            schedule_ids = await create_timetable(loader, lessons)
+            report(f"term {number}: {len(schedule_ids)} lessons")
+
+            first_day = max(start, attendance_from)
+            last_day = min(end, today - timedelta(days=1))
+            if first_day <= last_day and args.attendance_rate > 0:
+                records = attendance_records(
+                    rng,
+                    start,
+                    first_day,
+                    last_day,
+                    ref,
+                    people,
+                    lessons,
+                    schedule_ids,
+                    args.attendance_rate,
+                )
+                total = await loader.copy_attendance(records)
+                report(f"term {number}: {total} attendance records")
+
+    await apply_invalidations(set(), shared=True, schedules=True)
+    await engine.dispose()
+    report("done")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--terms", type=int, default=2)
+    parser.add_argument("--groups", type=int, default=500)
+    parser.add_argument("--teachers", type=int, default=2000)
+    parser.add_argument("--students", type=int, default=30000)
+    parser.add_argument("--subjects", type=int, default=300)
+    parser.add_argument(
+        "--stream-size", type=int, default=3, help="Groups sharing a lecture"
+    )
+    parser.add_argument("--days-per-week", type=int, default=5, choices=range(1, 7))
+    parser.add_argument(
+        "--lessons-per-day",
+        type=int,
+        default=3,
+        choices=range(1, len(PERIOD_TIMES) + 1),
+    )
+    parser.add_argument(
+        "--attendance-weeks",
+        type=int,
+        default=8,
+        help="Weeks of attendance before today (0 to skip)",
+    )
+    parser.add_argument(
+        "--attendance-rate",
+        type=float,
+        default=0.8,
+        help="Share of students scanned per lesson",
+    )
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    if args.teachers < 1 or args.groups < 1:
+        parser.error("--teachers and --groups must be positive")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(generate(parse_args()))
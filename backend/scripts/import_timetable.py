@@ -0,0 +1,58 @@
+"""
+Import a registrar timetable export (CSV or XLSX).
+
+Lessons are matched to the stored timetable within their slot (term, week
+type, day, lesson period) by teacher or by shared groups, and only the
+differences are written. A changed teacher or group list is updated in
+place.
+
+    python -m scripts.import_timetable timetable.csv [--prune] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from app.cache import apply_invalidations
+from app.database import async_session, engine
+from app.services.timetable_import import (
+    TimetableImporter,
+    TimetableImportError,
+    iter_rows,
+)
+
+
+async def main(path: str, prune: bool, dry_run: bool) -> int:
+    async with async_session() as session:
+        with open(path, "rb") as stream:
+            try:
+                summary = await TimetableImporter(session).run(
+                    iter_rows(stream, path), prune=prune, dry_run=dry_run
+                )
+            except TimetableImportError as e:
+                print("\n".join(e.errors), file=sys.stderr)
+                return 1
+        if not dry_run:
+            await session.commit()
+            await apply_invalidations(set(), schedules=True)
+
+    await engine.dispose()
+    print(json.dumps({"dry_run": dry_run, **summary}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="CSV or XLSX file")
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete stored lessons of the imported terms missing from the file, "
+        "except those with attendance",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report changes without writing"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.path, args.prune, args.dry_run)))
@@ -0,0 +1,432 @@
+"""
+Async load generator for the login rush, schedule reads and QR bursts.
+
+By default the FastAPI app runs in process over httpx's ASGI transport,
+against a fresh SQLite database and an in-memory fake Redis, so it needs no
+external services. Pass --database-url for a local (migrated, empty)
+Postgres, or --url to drive a running server over HTTP instead.
+
+    pip install -r requirements-dev.txt
+    python -m scripts.loadtest [--scenarios login,schedule,qr_burst,roster]
+    python -m scripts.loadtest --url http://localhost:8080/api --no-seed
+
+Reports throughput and p50/p95/p99 latency per endpoint. SQLite serializes
+writes, so use Postgres for numbers that mean anything about the QR burst.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import sys
+import time
+from base64 import b64encode
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+DEFAULT_SQLITE = Path(__file__).resolve().parent.parent / ".loadtest.sqlite3"
+SCENARIOS = ("login", "schedule", "qr_burst", "roster")
+
+
+# ------------------- Recording -------------------
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = round(p / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+
+class Recorder:
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.started_at = time.perf_counter()
+
+    async def request(
+        self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        started_at = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        stats = self.endpoints.setdefault(label, EndpointStats())
+        stats.latencies.append(time.perf_counter() - started_at)
+        stats.statuses[response.status_code] = (
+            stats.statuses.get(response.status_code, 0) + 1
+        )
+        return response
+
+    def report(self, title: str) -> None:
+        elapsed = time.perf_counter() - self.started_at
+        print(f"\n== {title} ({elapsed:.1f}s)")
+        print(
+            f"{'endpoint':<34}{'count':>7}{'req/s':>9}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses"
+        )
+        for label, stats in sorted(self.endpoints.items()):
+            latencies = sorted(stats.latencies)
+            statuses = " ".join(
+                f"{code}x{count}" for code, count in sorted(stats.statuses.items())
+            )
+            print(
+                f"{label:<34}{len(latencies):>7}{len(latencies) / elapsed:>9.1f}"
+                f"{percentile(latencies, 50) * 1000:>9.1f}"
+                f"{percentile(latencies, 95) * 1000:>9.1f}"
+                f"{percentile(latencies, 99) * 1000:>9.1f}  {statuses}"
+            )
+
+
+# ------------------- Virtual users -------------------
+
+
+@dataclass
+class VirtualUser:
+    email: str
+    token: Optional[str] = None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+async def log_in(
+    client: httpx.AsyncClient, recorder: Recorder, user: VirtualUser, password: str
+) -> None:
+    response = await recorder.request(
+        client,
+        "POST /auth/jwt/login",
+        "POST",
+        "/auth/jwt/login",
+        data={"username": user.email, "password": password},
+    )
+    if response.status_code == 200:
+        user.token = response.json()["access_token"]
+
+
+async def run_workers(
+    concurrency: int, duration: float, step: Callable[[], Awaitable[None]]
+) -> None:
+    """`concurrency` workers repeating `step` until `duration` seconds pass"""
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await step()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def encrypt_qr(session_key: str, payload: Dict[str, Any]) -> str:
+    """Mirror of the frontend: AES-GCM, 12-byte IV prefix, base64"""
+    iv = secrets.token_bytes(12)
+    ciphertext = AESGCM(session_key.encode("utf-8")[:32]).encrypt(
+        iv, json.dumps(payload).encode("utf-8"), None
+    )
+    return b64encode(iv + ciphertext).decode()
+
+
+# ------------------- Scenarios -------------------
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.teachers = [
+            VirtualUser(f"teacher{i}@example.com") for i in range(1, args.teachers + 1)
+        ]
+        self.students = [
+            VirtualUser(f"student{i}@example.com") for i in range(1, args.students + 1)
+        ]
+
+    async def ensure_logged_in(self, users: List[VirtualUser]) -> None:
+        recorder = Recorder()  # setup logins aren't reported
+        pending = [user for user in users if user.token is None]
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+
+        async def one(user):
+            async with semaphore:
+                await log_in(self.client, recorder, user, self.args.password)
+
+        await asyncio.gather(*(one(user) for user in pending))
+
+    async def login(self) -> Recorder:
+        """The 8:55 rush: everyone logs in at once"""
+        recorder = Recorder()
+        users = self.rng.sample(
+            self.teachers + self.students,
+            min(self.args.login_users, len(self.teachers) + len(self.students)),
+        )
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+
+        async def one(user):
+            async with semaphore:
+                await log_in(self.client, recorder, user, self.args.password)
+
+        await asyncio.gather(*(one(user) for user in users))
+        return recorder
+
+    async def schedule(self) -> Recorder:
+        teachers = self.teachers[: self.args.active_users]
+        students = self.students[: self.args.active_users]
+        await self.ensure_logged_in(teachers + students)
+        recorder = Recorder()
+        today = date.today().isoformat()
+
+        # (users, path, query parameters)
+        requests = [
+            (
+                teachers,
+                "/teacher/schedule/day",
+                {"target_date": today, "only_for_me": "true"},
+            ),
+            (
+                teachers,
+                "/teacher/schedule/week",
+                {"week_type": "upper", "only_for_me": "true"},
+            ),
+            (students, "/student/schedule/day", {"target_date": today}),
+            (students, "/student/schedule/week", {"week_type": "upper"}),
+        ]
+
+        async def step():
+            users, url, params = self.rng.choice(requests)
+            user = self.rng.choice(users)
+            await recorder.request(
+                self.client,
+                f"GET {url}",
+                "GET",
+                url,
+                params=params,
+                headers=user.headers,
+            )
+
+        await run_workers(self.args.concurrency, self.args.duration, step)
+        return recorder
+
+    async def _find_lesson(self):
+        """A teacher with at least one lesson this week, and that lesson"""
+        recorder = Recorder()
+        for teacher in self.teachers:
+            await self.ensure_logged_in([teacher])
+            response = await recorder.request(
+                self.client,
+                "GET /teacher/schedule/week",
+                "GET",
+                "/teacher/schedule/week",
+                params={"week_type": "upper", "only_for_me": "true"},
+                headers=teacher.headers,
+            )
+            for lessons in response.json().values():
+                if lessons:
+                    return teacher, lessons[0]
+        raise SystemExit("No teacher has lessons; seed the database first.")
+
+    async def qr_burst(self) -> Recorder:
+        """One teacher shows a QR code, burst_size students confirm at once"""
+        teacher, lesson = await self._find_lesson()
+        students = self.students[: self.args.burst_size]
+        await self.ensure_logged_in(students)
+        recorder = Recorder()
+
+        response = await recorder.request(
+            self.client,
+            "POST /session/create",
+            "POST",
+            "/session/create",
+            headers=teacher.headers,
+        )
+        session_key = response.json()["session_key"]
+        teacher_user_id = lesson["teacher"]["user_id"]
+
+        async def confirm(student):
+            payload = {"schedule_id": lesson["id"], "timestamp": time.time()}
+            await recorder.request(
+                self.client,
+                "POST /attendance/confirm",
+                "POST",
+                "/attendance/confirm",
+                json={
+                    "data": encrypt_qr(session_key, payload),
+                    "teacher_id": teacher_user_id,
+                },
+                headers=student.headers,
+            )
+
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+
+        async def limited(student):
+            async with semaphore:
+                await confirm(student)
+
+        await asyncio.gather(*(limited(student) for student in students))
+        return recorder
+
+    async def roster(self) -> Recorder:
+        """Teachers polling who has scanned in"""
+        teacher, lesson = await self._find_lesson()
+        recorder = Recorder()
+        params = {
+            "subject_id": lesson["subject"]["id"],
+            "lesson_date": date.today().isoformat(),
+        }
+
+        async def step():
+            await recorder.request(
+                self.client,
+                "GET /attendance/day",
+                "GET",
+                "/attendance/day",
+                params=params,
+                headers=teacher.headers,
+            )
+            await asyncio.sleep(self.args.poll_interval)
+
+        await run_workers(self.args.concurrency, self.args.duration, step)
+        return recorder
+
+
+# ------------------- In-process setup -------------------
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Settings are read at import time, so this runs before importing app"""
+    database_url = args.database_url
+    if database_url is None:
+        DEFAULT_SQLITE.unlink(missing_ok=True)
+        database_url = f"sqlite+aiosqlite:///{DEFAULT_SQLITE}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # One JSON log line per request would drown the report
+    os.environ.setdefault("REQUEST_INSTRUMENTATION_SAMPLE_RATE", "0")
+
+
+def use_fake_redis() -> None:
+    """Point the shared Redis clients at one in-memory fakeredis server"""
+    import fakeredis
+
+    from app.redis import (
+        InstrumentedConnectionPool,
+        redis_binary_client,
+        redis_client,
+    )
+
+    server = fakeredis.FakeServer()
+    for client, decode_responses in (
+        (redis_client, True),
+        (redis_binary_client, False),
+    ):
+        client.connection_pool = InstrumentedConnectionPool(
+            connection_class=fakeredis.aioredis.FakeConnection,
+            server=server,
+            decode_responses=decode_responses,
+        )
+
+
+async def prepare_database(args: argparse.Namespace) -> None:
+    from app.database import engine
+    from app.models import Base
+    from scripts.generate_dataset import generate, parse_args
+
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    if not args.no_seed:
+        dataset_args = {
+            "--terms": 1,
+            "--groups": args.groups,
+            "--teachers": args.teachers,
+            "--students": args.students,
+            "--subjects": 50,
+            "--attendance-weeks": 2,
+            "--password": args.password,
+        }
+        await generate(
+            parse_args([str(part) for item in dataset_args.items() for part in item])
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with AsyncExitStack() as stack:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        else:
+            configure_environment(args)
+            use_fake_redis()
+            await prepare_database(args)
+
+            from app.main import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://loadtest/api",
+                timeout=args.timeout,
+            )
+        await stack.enter_async_context(client)
+
+        load_test = LoadTest(client, args)
+        for name in args.scenarios:
+            recorder = await getattr(load_test, name)()
+            recorder.report(name)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    target = parser.add_argument_group("target")
+    target.add_argument("--url", help="Base URL of a running server, e.g. .../api")
+    target.add_argument(
+        "--database-url",
+        help="In-process only; defaults to a fresh SQLite file",
+    )
+    target.add_argument(
+        "--no-seed", action="store_true", help="Use the data already in the database"
+    )
+
+    data = parser.add_argument_group("dataset (seeded, or already present)")
+    data.add_argument("--groups", type=int, default=20)
+    data.add_argument("--teachers", type=int, default=40)
+    data.add_argument("--students", type=int, default=600)
+    data.add_argument("--password", default="password")
+
+    load = parser.add_argument_group("load")
+    load.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=list(SCENARIOS),
+        help=f"Comma-separated, from: {','.join(SCENARIOS)}",
+    )
+    load.add_argument("--concurrency", type=int, default=50)
+    load.add_argument("--duration", type=float, default=15.0, help="Seconds")
+    load.add_argument("--login-users", type=int, default=200)
+    load.add_argument("--active-users", type=int, default=50)
+    load.add_argument("--burst-size", type=int, default=300)
+    load.add_argument("--poll-interval", type=float, default=1.0)
+    load.add_argument("--timeout", type=float, default=30.0)
+    load.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,26 @@
+"""
+Upsert the constant reference data (roles, sites, lesson periods, ...).
+
+    python -m scripts.seed
+"""
+
+import asyncio
+
+from app.database import async_session, engine
+from app.db.seed import seed_all_models
+
+
+async def main():
+    async with async_session() as session:
+        results = await seed_all_models(session)
+    await engine.dispose()
+
+    for table, result in results.items():
+        print(
+            f"{table}: {result.inserted} inserted, {result.updated} updated, "
+            f"{result.unchanged} unchanged"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())